@@ -1,7 +1,14 @@
 import csv
+import io
 import random
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import Iterator, Tuple
+
+# Bound once so the hot row-generation paths avoid a global + attribute lookup per call.
+_choices = random.choices
+_randrange = random.randrange
 
 # --- Step 1: Define Sample Data Lists ---
 # These lists provide sample values for each field.
@@ -19,108 +26,152 @@ branches = ["Chesterfield", "London", "Oxford", "Brighton", "Birmingham", "Manch
 payment_types = ["CARD", "CASH"]
 # Prices as strings (some with £ symbol, some without)
 prices = ["£3.50", "£2.50", "£1.50", "3.50", "4.50", "3.75", "3.25", "2.50", "3.80", "3.60"]
+# Column order of the generated CSV; rows are written as tuples in this order.
+header = ["Customer Name", "Drink", "Qty", "Price", "Branch", "Payment Type", "Card Number", "Date/Time"]
+# Positions of the fields that may be blanked out in a malformed row.
+malformable_fields = [header.index(field) for field in ("Drink", "Qty", "Price", "Branch")]
 
 # --- Step 2: Date and Time Generation ---
 # We'll generate a random transaction date/time as a string.
 # For this example, we'll specify a start date and generate times within a 3-hour window.
 start_datetime = datetime(2021, 8, 25, 9, 0)  # 25/08/2021 09:00
-
-def random_date() -> str:
-    """
-    Generates a random date/time string within a 3-hour window from the start date.
-    The format will be "dd/mm/yyyy HH:MM".
-    """
-    delta_minutes = random.randint(0, 180)
-    transaction_time = start_datetime + timedelta(minutes=delta_minutes)
-    return transaction_time.strftime("%d/%m/%Y %H:%M")
+# There are only 181 possible minutes in the window, so format each one once up front.
+date_strings = tuple(
+    (start_datetime + timedelta(minutes=minutes)).strftime("%d/%m/%Y %H:%M")
+    for minutes in range(181)
+)
 
 # --- Step 3: Card Number Generation ---
+# Card numbers are drawn as a single integer below 10**16 and zero-padded to 16 digits.
+CARD_NUMBER_RANGE: int = 10 ** 16
+
 def random_card_number() -> str:
     """
     Generates a random 16-digit card number as a string.
     """
-    return ''.join(str(random.randint(0, 9)) for _ in range(16))
+    return f"{_randrange(CARD_NUMBER_RANGE):016d}"
 
-# --- Step 4: Row Generation Functions ---
-def generate_normal_row() -> Dict[str, str]:
+# --- Step 4: Row Generation ---
+def generate_rows(total_rows: int, malformed_rate: float = 0.0) -> Iterator[Tuple[str, ...]]:
     """
-    Generates a normal, correctly formatted row.
-    
-    The order of fields is:
-    Customer Name, Drink, Qty, Price, Branch, Payment Type, Card Number, Date/Time.
-    For the Drink field, sometimes a 'detailed' description is used which will typically need quotes.
+    Generates total_rows rows by sampling each column in one bulk call.
+
+    Rather than making ~25 random calls per row, every column is drawn up front with
+    random.choices(..., k=total_rows) and the columns are zipped into rows in header order.
+    Date/time strings are drawn from the precomputed date_strings table.
+
+    Malformed rows are chosen with one weighted draw per chunk: each row gets either no
+    field or one of malformable_fields (each with probability malformed_rate / 4), and the
+    chosen cells are blanked directly in their columns.
+
+    Args:
+        total_rows (int): Number of rows to generate.
+        malformed_rate (float): Fraction of rows that should be intentionally malformed.
+
+    Returns:
+        Iterator[Tuple[str, ...]]: Rows in the order
+        Customer Name, Drink, Qty, Price, Branch, Payment Type, Card Number, Date/Time.
+
+    Raises:
+        ValueError: If malformed_rate is not between 0 and 1.
     """
-    first = random.choice(first_names)
-    last = random.choice(last_names)
-    customer_name = f"{first} {last}"
-    
-    # Randomly decide to use a detailed drink or a simple drink.
-    if random.random() < 0.5:
-        # Use detailed drink which might include commas.
-        drink_val = random.choice(drinks_detailed)
-    else:
-        drink_val = random.choice(drinks_simple)
-    # We let csv.DictWriter handle quotes automatically (it will quote if the field contains commas)
-    
-    qty = str(random.choice([1, 2, 3]))
-    price = random.choice(prices)
-    branch = random.choice(branches)
-    payment = random.choice(payment_types)
-    # For CARD payments, generate a card number; for CASH, leave it blank.
-    card_number = random_card_number() if payment == "CARD" else ""
-    date_time = random_date()
-    
-    return {
-        "Customer Name": customer_name,
-        "Drink": drink_val,
-        "Qty": qty,
-        "Price": price,
-        "Branch": branch,
-        "Payment Type": payment,
-        "Card Number": card_number,
-        "Date/Time": date_time
-    }
-
-def generate_malformed_row() -> Dict[str, str]:
+    if not 0 <= malformed_rate <= 1:
+        raise ValueError(f"malformed_rate must be between 0 and 1, got {malformed_rate}")
+    choices = _choices
+    n = total_rows
+
+    firsts = choices(first_names, k=n)
+    lasts = choices(last_names, k=n)
+    customer_names = [f"{first} {last}" for first, last in zip(firsts, lasts)]
+
+    # Detailed drinks (which may contain commas and so get quoted) are picked half of the time.
+    use_detailed = choices((True, False), k=n)
+    detailed = choices(drinks_detailed, k=n)
+    simple = choices(drinks_simple, k=n)
+    drinks = [d if flag else s for flag, d, s in zip(use_detailed, detailed, simple)]
+
+    qtys = choices(["1", "2", "3"], k=n)
+    row_prices = choices(prices, k=n)
+    row_branches = choices(branches, k=n)
+    payments = choices(payment_types, k=n)
+    card_numbers = [random_card_number() if payment == "CARD" else "" for payment in payments]
+
+    date_times = choices(date_strings, k=n)
+
+    columns = [customer_names, drinks, qtys, row_prices, row_branches, payments, card_numbers, date_times]
+
+    if malformed_rate > 0:
+        field_weight = malformed_rate / len(malformable_fields)
+        blanked_fields = choices(
+            [None, *malformable_fields],
+            weights=[1 - malformed_rate, *([field_weight] * len(malformable_fields))],
+            k=n
+        )
+        for index, field in enumerate(blanked_fields):
+            if field is not None:
+                columns[field][index] = ""
+
+    return zip(*columns)
+
+# --- Step 5: Generate Data and Write CSV ---
+# Rows are generated and written this many at a time so memory stays bounded for large files.
+CHUNK_SIZE: int = 4096
+# Write buffer for the output file (1 MiB) to amortise syscall cost.
+WRITE_BUFFER_SIZE: int = 1 << 20
+
+def _format_chunk(size: int, malformed_rate: float) -> str:
     """
-    Generates a row with deliberate malformations, such as missing fields.
-    Randomly removes one of the fields to simulate a malformed row.
+    Generates size rows and returns them formatted as CSV text.
+
+    Runs in a worker process when generate_csv is called with workers > 1; each process
+    has its own independently seeded random state.
     """
-    row = generate_normal_row()
-    
-    # Choose one field to blank out
-    field_to_remove = random.choice(["Drink", "Qty", "Price", "Branch"])
-    row[field_to_remove] = ""
-    
-    return row
+    buffer = io.StringIO()
+    csv.writer(buffer, quoting=csv.QUOTE_MINIMAL).writerows(generate_rows(size, malformed_rate))
+    return buffer.getvalue()
 
-# --- Step 5: Generate Data and Write CSV ---
-def generate_csv(filename: str, total_rows: int = 350, malformed_rate: float = 0.1) -> None:
+def generate_csv(filename: str, total_rows: int = 350, malformed_rate: float = 0.1,
+                 chunk_size: int = CHUNK_SIZE, workers: int = 1) -> None:
     """
     Generates a CSV file with randomly generated data.
+
+    Rows are generated and written in chunks of chunk_size, so memory use does not grow
+    with total_rows. Each chunk's rows are streamed straight into writer.writerows; since
+    the writer keeps no reference to a row, zip reuses a single row tuple for the whole
+    chunk, acting as a preallocated row pool without any Python-level copying.
+
+    With workers > 1 the chunks are generated and formatted in parallel worker processes
+    (threads would serialise on the GIL) and written to the file in order. This only pays
+    off for large files, e.g. millions of rows for stress tests.
     
     Args:
         filename (str): The output filename (should be placed in the data/ directory).
         total_rows (int): Total number of rows to generate.
         malformed_rate (float): Fraction of rows that should be intentionally malformed.
+        chunk_size (int): Number of rows generated and written per batch.
+        workers (int): Number of worker processes used to format chunks.
+
+    Raises:
+        ValueError: If malformed_rate is not between 0 and 1.
     """
-    header = ["Customer Name", "Drink", "Qty", "Price", "Branch", "Payment Type", "Card Number", "Date/Time"]
-    rows: List[Dict[str, str]] = []
-    
-    # Optionally, you can include some fixed rows (if desired).
-    # Here we'll simply generate random rows.
-    for _ in range(total_rows):
-        if random.random() < malformed_rate:
-            row = generate_malformed_row()
+    # Checked before the file is opened, so a bad rate never truncates an existing file.
+    if not 0 <= malformed_rate <= 1:
+        raise ValueError(f"malformed_rate must be between 0 and 1, got {malformed_rate}")
+    chunk_sizes = [min(chunk_size, total_rows - start) for start in range(0, total_rows, chunk_size)]
+
+    # csv.writer handles quoting minimally (fields containing commas get quoted).
+    with open(filename, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as csvfile:
+        writer = csv.writer(csvfile, quoting=csv.QUOTE_MINIMAL)
+        writer.writerow(header)
+
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # map() yields the formatted chunks in submission order.
+                for text in executor.map(_format_chunk, chunk_sizes, repeat(malformed_rate)):
+                    csvfile.write(text)
         else:
-            row = generate_normal_row()
-        rows.append(row)
-    
-    # Write data to CSV using DictWriter, which automatically handles quoting minimally.
-    with open(filename, "w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=header, quoting=csv.QUOTE_MINIMAL)
-        writer.writeheader()
-        writer.writerows(rows)
+            for size in chunk_sizes:
+                writer.writerows(generate_rows(size, malformed_rate))
     
     print(f"Generated {total_rows} rows of test data in {filename}")
 
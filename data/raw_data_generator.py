@@ -1,3 +1,4 @@
+import csv
 import pandas as pd
 import random
 from datallm import DataLLM
@@ -11,12 +12,12 @@ def generate_full_name():
     last_names = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia"]
     return f"{random.choice(first_names)} {random.choice(last_names)}"
 
-# Define the mock data generation
+# Define the mock data generation.
+# Customer names are generated locally below, so they are not requested from the LLM.
 mock_data = datallm.mock(
     n=100,  # number of samples
     data_description="Generate mock transaction data for a coffee shop",
     columns={
-        "Customer Name": {"prompt": "Full name of the customer", "dtype": "string"},
         "Drink": {"prompt": "Description of the drink ordered", "dtype": "string"},
         "Qty": {"prompt": "Quantity of drinks ordered", "dtype": "integer"},
         "Price": {"prompt": "Total price of the order", "dtype": "float"},
@@ -28,12 +29,17 @@ mock_data = datallm.mock(
     progress_bar=False
 )
 
-# Apply the full name generation function to ensure all names have both first and last names
-mock_data['Customer Name'] = [generate_full_name() for _ in range(len(mock_data))]
+# Add the customer names as the first column; all names have both first and last names
+mock_data.insert(0, "Customer Name", [generate_full_name() for _ in range(len(mock_data))])
 
 # Save the generated mock data to a CSV file
 mock_data_path = "/mnt/data/mock_transaction_data.csv"
-mock_data.to_csv(mock_data_path, index=False)
+# The frame has no meaningful index, so rows are written straight through csv.writer;
+# itertuples(name=None) avoids pandas' per-column to_csv formatting machinery.
+with open(mock_data_path, "w", newline="", encoding="utf-8") as csv_file:
+    writer = csv.writer(csv_file)
+    writer.writerow(mock_data.columns)
+    writer.writerows(mock_data.itertuples(index=False, name=None))
 
 # Print the path to the saved file
 print(mock_data_path)
@@ -1,29 +1,148 @@
 import os
+import tempfile
 import pymysql
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from itertools import islice
+from operator import itemgetter
+from typing import List, Dict, Any, Tuple, Iterable, Iterator
 from dotenv import load_dotenv
 from utils.logger import get_logger
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file, unless the app or GUI has already done so.
+if not os.environ.get("ETL_ENV_LOADED"):
+    load_dotenv()
 
 logger = get_logger(__name__, log_level=logging.DEBUG)
 
+# Optional bulk load statement for the transactions table, which is by far the largest, used when
+# load_data is called with file_load=True. The file is written by _load_rows_from_file in MySQL's
+# default tab-separated format: tab, newline and backslash are backslash-escaped and NULL is \N.
+TRANSACTION_LOAD_QUERY: str = (
+    "LOAD DATA LOCAL INFILE %s INTO TABLE transactions "
+    "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+    "LINES TERMINATED BY '\\n' "
+    "(branch_id, date_time, price, qty, payment_type)"
+)
+# Lists the warnings of the previous statement. LOAD DATA LOCAL reports bad values and duplicate
+# keys as warnings rather than errors, so any warning fails the load.
+SHOW_WARNINGS_SQL: str = "SHOW WARNINGS"
+
+# INSERT statements used by load_data. They must end in "VALUES (%s, ...)" with no trailing
+# semicolon so that pymysql's executemany rewrites them into a single multi-row INSERT.
+BRANCH_INSERT_QUERY: str = "INSERT INTO branches (id, name) VALUES (%s, %s)"
+TRANSACTION_INSERT_QUERY: str = (
+    "INSERT INTO transactions (branch_id, date_time, price, qty, payment_type) VALUES (%s, %s, %s, %s, %s)"
+)
+PRODUCT_INSERT_QUERY: str = "INSERT INTO products (id, product_name, size, flavour, price) VALUES (%s, %s, %s, %s, %s)"
+TRANSACTION_PRODUCT_INSERT_QUERY: str = (
+    "INSERT INTO transaction_product (id, transaction_id, product_id) VALUES (%s, %s, %s)"
+)
+
+# Row builders turning each record into a parameter tuple in column order with a single C call.
+_branch_row = itemgetter("id", "name")
+_transaction_row = itemgetter("branch_id", "date_time", "price", "qty", "payment_type")
+_product_row = itemgetter("id", "product_name", "size", "flavour", "price")
+_transaction_product_row = itemgetter("id", "transaction_id", "product_id")
+
+# Escapes for a field in a LOAD DATA file with the default ESCAPED BY '\\'.
+_LOAD_FILE_ESCAPES: Dict[int, str] = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"})
+
+# Session setting for a load: every table is written in one transaction, committed once.
+BULK_LOAD_SESSION_SQL: str = "SET autocommit=0"
+# Additionally skips binary logging and unique/foreign key checks for a fast load, and the
+# statement restoring them. Requires a privileged user, the loaded rows are not replicated, and
+# duplicate or orphaned rows are not rejected, so it is only used when load_data is called
+# with fast_load=True.
+FAST_LOAD_SESSION_SQL: str = "SET sql_log_bin=0, unique_checks=0, foreign_key_checks=0"
+RESTORE_FAST_LOAD_SESSION_SQL: str = "SET sql_log_bin=1, unique_checks=1, foreign_key_checks=1"
+
+# Rows passed to each executemany call. pymysql rewrites a batch into multi-row INSERTs of at
+# most Cursor.max_stmt_length bytes, which keeps every statement under max_allowed_packet, so
+# the batch only bounds the parameter tuples held at once. Override with mysql_bulk_batch in the .env file.
+DEFAULT_BATCH_SIZE: int = int(os.getenv("mysql_bulk_batch", "10000"))
+
+def _chunks(rows: Iterable[Tuple[Any, ...]], size: int) -> Iterator[List[Tuple[Any, ...]]]:
+    """Yields successive lists of at most size rows, consuming rows lazily."""
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def _insert_in_batches(cursor: pymysql.cursors.Cursor, query: str, rows: Iterable[Tuple[Any, ...]],
+                       batch_size: int) -> int:
+    """
+    Inserts rows with one executemany call per batch of batch_size rows.
+
+    Returns:
+        int: The total number of rows inserted.
+    """
+    inserted = 0
+    for batch in _chunks(rows, batch_size):
+        cursor.executemany(query, batch)
+        inserted += cursor.rowcount
+    return inserted
+
 def create_db_connection() -> pymysql.connections.Connection:
     """Creates and returns a new database connection."""
     return pymysql.connect(
         host=os.getenv("mysql_host", "localhost"),
         user=os.getenv("mysql_user", "root"),
         password=os.getenv("mysql_pass", ""),
-        database=os.getenv("mysql_db", "cafe")
+        database=os.getenv("mysql_db", "cafe"),
+        local_infile=True  # Allows the opt-in LOAD DATA LOCAL INFILE transactions load (file_load=True).
     )
 
-def load_data(transformed_data: Dict[str, Any], connection: pymysql.connections.Connection) -> None:
+def _load_file_field(value: Any) -> str:
+    """Formats a value as a LOAD DATA field: None becomes \\N and special characters are escaped."""
+    if value is None:
+        return "\\N"
+    return str(value).translate(_LOAD_FILE_ESCAPES)
+
+def _load_rows_from_file(cursor: pymysql.cursors.Cursor, query: str, rows: Iterable[Tuple[Any, ...]]) -> int:
+    """
+    Loads rows with a single LOAD DATA LOCAL INFILE statement (one of the *_LOAD_QUERY constants).
+
+    The rows are written to a temporary tab-separated file which the server reads in one
+    pass, avoiding per-row SQL parsing. The file is removed once the load has finished.
+
+    Returns:
+        int: The number of rows loaded.
+
+    Raises:
+        pymysql.err.DataError: If the server reported any warning for the load, e.g. a value
+            that had to be converted or a duplicate key, which LOAD DATA LOCAL would otherwise skip.
+    """
+    # delete=False so the file can be reopened by pymysql on Windows while it still exists.
+    with tempfile.NamedTemporaryFile("w", suffix=".tsv", newline="", encoding="utf-8", delete=False) as tmp_file:
+        tmp_file.writelines("\t".join(map(_load_file_field, row)) + "\n" for row in rows)
+        is_empty = tmp_file.tell() == 0
+    try:
+        if is_empty:
+            return 0
+        cursor.execute(query, (tmp_file.name,))
+        loaded = cursor.rowcount
+        cursor.execute(SHOW_WARNINGS_SQL)
+        warnings = cursor.fetchall()
+        if warnings:
+            raise pymysql.err.DataError(
+                f"LOAD DATA reported {len(warnings)} warning(s), first: {warnings[0]}"
+            )
+        return loaded
+    finally:
+        os.remove(tmp_file.name)
+
+def load_data(transformed_data: Dict[str, Any], connection: pymysql.connections.Connection,
+              batch_size: int = DEFAULT_BATCH_SIZE, fast_load: bool = False,
+              file_load: bool = False) -> None:
     """
     Loads transformed data into MySQL database tables for transactions, branches,
     products, and the transaction_product mapping table.
 
+    All four tables are written in a single transaction, each inserted in batches of batch_size
+    rows that pymysql sends as one multi-row INSERT. With file_load, transactions are instead bulk
+    loaded with LOAD DATA LOCAL INFILE; this needs local_infile enabled on the server and a
+    connection opened with local_infile=True (as create_db_connection does). With fast_load,
+    binary logging and unique/foreign key checks are disabled for the session while the load runs.
+
     The transformed_data dictionary is expected to contain the following keys:
         "final_transactions": A list of transactions with keys such as "id", "branch_id", "date_time", 
                                                                 "price", "qty", and "payment_type".
@@ -39,6 +158,13 @@ def load_data(transformed_data: Dict[str, Any], connection: pymysql.connections.
 
     Args:
         transformed_data (Dict[str, Any]): The transformed data produced by the ETL pipeline.
+        connection (pymysql.connections.Connection): An open database connection.
+        batch_size (int): Maximum number of rows per executemany call.
+        fast_load (bool): Disable the binary log and unique/foreign key checks for the load. Only for
+            a dedicated loading window on a server without replicas, with data known to be consistent;
+            needs SUPER or SYSTEM_VARIABLES_ADMIN.
+        file_load (bool): Load transactions with LOAD DATA LOCAL INFILE instead of INSERTs. Any
+            warning the server reports for the load raises, so the whole load is rolled back.
 
     Returns:
         None
@@ -61,38 +187,68 @@ def load_data(transformed_data: Dict[str, Any], connection: pymysql.connections.
         logger.info("Starting database insertion...")
 
         with connection.cursor() as cursor:
-            # Insert branches explicitly
-            cursor.executemany(
-                "INSERT INTO branches (id, name) VALUES (%s, %s)",
-                [(b["id"], b["name"]) for b in branches]
-            )
-            logger.info(f"Inserted {cursor.rowcount} records into branches.")
-
-            # Insert transactions explicitly
-            cursor.executemany(
-                "INSERT INTO transactions (branch_id, date_time, price, qty, payment_type) VALUES (%s, %s, %s, %s, %s)",
-                [(t["branch_id"], t["date_time"], t["price"], t["qty"], t["payment_type"]) for t in transactions]
-            )
-            logger.info(f"Inserted {cursor.rowcount} records into transactions.")
-
-            # Insert products explicitly
-            cursor.executemany(
-                "INSERT INTO products (id, product_name, size, flavour, price) VALUES (%s, %s, %s, %s, %s)",
-                [(p["id"], p["product_name"], p["size"], p["flavour"], p["price"]) for p in products]
-            )
-            logger.info(f"Inserted {cursor.rowcount} records into products.")
-
-            # Insert transaction-product mapping explicitly
-            cursor.executemany(
-                "INSERT INTO transaction_product (id, transaction_id, product_id) VALUES (%s, %s, %s)",
-                [(tp["id"], tp["transaction_id"], tp["product_id"]) for tp in transaction_product]
-            )
-            logger.info(f"Inserted {cursor.rowcount} records into transaction_product.")
-
+            cursor.execute(BULK_LOAD_SESSION_SQL)
+            if fast_load:
+                cursor.execute(FAST_LOAD_SESSION_SQL)
+            try:
+                # Insert branches explicitly
+                inserted = _insert_in_batches(
+                    cursor,
+                    BRANCH_INSERT_QUERY,
+                    map(_branch_row, branches),
+                    batch_size
+                )
+                logger.info("Inserted %d records into branches.", inserted)
+
+                # Insert transactions, or bulk load them from a temporary file
+                if file_load:
+                    inserted = _load_rows_from_file(
+                        cursor,
+                        TRANSACTION_LOAD_QUERY,
+                        map(_transaction_row, transactions)
+                    )
+                else:
+                    inserted = _insert_in_batches(
+                        cursor,
+                        TRANSACTION_INSERT_QUERY,
+                        map(_transaction_row, transactions),
+                        batch_size
+                    )
+                logger.info("Inserted %d records into transactions.", inserted)
+
+                # Insert products explicitly
+                inserted = _insert_in_batches(
+                    cursor,
+                    PRODUCT_INSERT_QUERY,
+                    map(_product_row, products),
+                    batch_size
+                )
+                logger.info("Inserted %d records into products.", inserted)
+
+                # Insert transaction-product mapping explicitly
+                inserted = _insert_in_batches(
+                    cursor,
+                    TRANSACTION_PRODUCT_INSERT_QUERY,
+                    map(_transaction_product_row, transaction_product),
+                    batch_size
+                )
+                logger.info("Inserted %d records into transaction_product.", inserted)
+            except Exception:
+                if fast_load:
+                    # Restoring must not replace the original error, e.g. when the connection dropped.
+                    try:
+                        cursor.execute(RESTORE_FAST_LOAD_SESSION_SQL)
+                    except pymysql.err.Error as restore_error:
+                        logger.warning("Could not restore session settings: %s", restore_error)
+                raise
+            if fast_load:
+                cursor.execute(RESTORE_FAST_LOAD_SESSION_SQL)
+
+        # One commit covers all four tables.
         connection.commit()
         logger.info("Data loaded and committed successfully.")
 
     except Exception as e:
-        logger.error(f"Error during database insertion: {e}")
+        logger.error("Error during database insertion: %s", e)
         connection.rollback()
         raise
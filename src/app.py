@@ -1,25 +1,106 @@
-from dotenv import load_dotenv
-load_dotenv("db/.env")
-from typing import List, Dict, Any
 import os
+from dotenv import load_dotenv
+# Read db/.env once per process tree: a pipeline launched by the GUI inherits the loaded values.
+# The path is resolved from this file rather than the working directory, and the flag is only
+# set once the file has actually been read, so the db module's own lookup still runs otherwise.
+if not os.environ.get("ETL_ENV_LOADED"):
+    if load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", ".env")):
+        os.environ["ETL_ENV_LOADED"] = "1"
+from typing import List, Dict, Any, Optional
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain
+import atexit
 import logging
+import pymysql
 from utils.logger import get_logger
 from src.extract.extract import extract_data
 from src.transform.transform import transform_data
-from db.db_cafe_alt_solution import load_data
+from db.db_cafe_alt_solution import load_data, create_db_connection
 
 logger = get_logger("app", log_level=logging.DEBUG)
 
+# Upper bound on the number of files extracted concurrently.
+MAX_EXTRACT_WORKERS: int = 8
+# Several files totalling at least this many bytes are parsed in worker processes, since CSV
+# parsing holds the GIL. Smaller inputs use threads; process start-up would outweigh the gain.
+PROCESS_POOL_MIN_BYTES: int = 32 * 1024 * 1024
+# Set by the GUI launcher to the marker it expects at the start of progress lines on stdout.
+# When unset (library, CLI and test callers), no progress lines are printed.
+PROGRESS_MARKER_ENV_VAR: str = "ETL_PROGRESS_MARKER"
+
+# Database connection shared by every pipeline run in this process (e.g. repeated GUI runs).
+_connection: Optional[pymysql.connections.Connection] = None
+
+def _extract_executor(file_paths: List[str]) -> Executor:
+    """
+    Chooses the executor used to extract the given files concurrently.
+
+    Returns:
+        Executor: A ProcessPoolExecutor when there are several files totalling at least
+        PROCESS_POOL_MIN_BYTES, otherwise a ThreadPoolExecutor.
+    """
+    total_bytes = sum(os.path.getsize(path) for path in file_paths if os.path.isfile(path))
+    if len(file_paths) > 1 and total_bytes >= PROCESS_POOL_MIN_BYTES:
+        workers = min(len(file_paths), os.cpu_count() or 1)
+        logger.info("Extracting %d bytes across %d worker process(es).", total_bytes, workers)
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=min(MAX_EXTRACT_WORKERS, len(file_paths)))
+
+def report_progress(percent: int) -> None:
+    """
+    Prints a "<marker> <percent>" line on stdout for the GUI's progress bar.
+
+    The GUI reads these lines instead of matching log wording, so log messages can change freely.
+    Nothing is printed unless the GUI launcher has set PROGRESS_MARKER_ENV_VAR.
+
+    Args:
+        percent (int): Progress of the pipeline run, from 0 to 100.
+    """
+    marker = os.environ.get(PROGRESS_MARKER_ENV_VAR)
+    if marker:
+        print(f"{marker} {percent}", flush=True)
+
+def get_db_connection() -> pymysql.connections.Connection:
+    """
+    Returns the shared database connection, creating it on first use.
+
+    An existing connection is pinged with reconnect=True, so a connection dropped by the
+    server (e.g. after wait_timeout) is transparently re-established.
+
+    Returns:
+        pymysql.connections.Connection: An open database connection.
+    """
+    global _connection
+    if _connection is None:
+        logger.info("Opening database connection...")
+        _connection = create_db_connection()
+        atexit.register(close_db_connection)
+    else:
+        _connection.ping(reconnect=True)
+    return _connection
+
+def close_db_connection() -> None:
+    """Closes the shared database connection, if one is open."""
+    global _connection
+    if _connection is not None:
+        try:
+            _connection.close()
+        except pymysql.err.Error as e:
+            logger.warning("Error while closing database connection: %s", e)
+        _connection = None
+
 def run_etl_pipeline(file_paths: List[str]) -> bool:
     """
     Executes the ETL pipeline for the provided CSV file paths or falls back to a default test dataset.
     The ETL pipeline consists of three main steps: Extract, Transform, and Load.
 
     The process involves:
-        - Extracting data from one or more CSV files (or from 'data/raw-data.csv' if no files are provided).
+        - Extracting data from one or more CSV files (or from 'data/raw-data.csv' if no files are provided),
+        with the files read concurrently in a thread pool, or in worker processes for large inputs.
         - Aggregating, normalising and transforming the data (removes PII, removes duplications,
         splits product details into separate columns)
-        - Loading the final transformed data into a local MYSQL database.
+        - Loading the final transformed data into a local MYSQL database, over a connection
+        that is opened once and reused by later runs.
 
     Args:
         file_paths (List[str]): List of CSV file paths to process.
@@ -45,66 +126,85 @@ def run_etl_pipeline(file_paths: List[str]) -> bool:
                 return False
             file_paths = [test_path]
             using_test_file = True
-            logger.info(f"Using fallback test file: {test_path}")
+            logger.info("Using fallback test file: %s", test_path)
         else:
-            logger.info(f"Received {len(file_paths)} file(s) from GUI or CLI:")
+            logger.info("Received %d file(s) from GUI or CLI:", len(file_paths))
             for path in file_paths:
-                logger.info(f" → {path}")
-        extracted_data: List[Dict[str, Any]] = []
-        # Process all selected files.
-        for file_path in file_paths:
-            # extract_data expects a file path or file-like object
-            logger.info(f"Extracting data from {file_path}...")
-            data = extract_data(file_path)  
+                logger.info(" → %s", path)
+        # Extract all selected files concurrently (threads, or processes for large inputs);
+        # map() returns results in file order.
+        logger.info("Extracting data from %d file(s)...", len(file_paths))
+        report_progress(10)
+        with _extract_executor(file_paths) as executor:
+            results = list(executor.map(extract_data, file_paths))
+
+        parts: List[List[Dict[str, Any]]] = []
+        for file_path, data in zip(file_paths, results):
             if data:
-                logger.info(f"Extracted {len(data)} records from {file_path}.")
-                extracted_data.extend(data)
+                logger.info("Extracted %d records from %s.", len(data), file_path)
+                parts.append(data)
             else:
-                logger.warning(f"No data extracted from {file_path}.")
-            if not extracted_data:
-                logger.warning("No data extracted from the selected files. ETL pipeline terminating gracefully.")
-                return False
+                logger.warning("No data extracted from %s.", file_path)
+        # Concatenate every file's records in one pass rather than growing a list per file.
+        extracted_data: List[Dict[str, Any]] = list(chain.from_iterable(parts))
+
+        # Only give up once every file has been tried, so an empty first file does not end the run.
+        if not extracted_data:
+            logger.warning("No data extracted from the selected files. ETL pipeline terminating gracefully.")
+            return False
 
         # Transform the aggregated extracted data.
-        logger.info(f"Transforming {len(extracted_data)} extracted records...")
+        logger.info("Transforming %d extracted records...", len(extracted_data))
+        report_progress(40)
         transformed_data = transform_data(extracted_data)
         if not transformed_data or not transformed_data.get("final_transactions"):
             logger.warning("Transformation produced no data. ETL pipeline terminating gracefully.")
             return False  # Graceful exit when transformation fails or produces no meaningful output
-        logger.info(f"Transformation successful. Keys in transformed data: {list(transformed_data.keys())}")
+        logger.info("Transformation successful. Keys in transformed data: %s", list(transformed_data.keys()))
         
         # Log summary stats
         record_count = len(transformed_data.get("final_transactions", []))
         branch_count = len(transformed_data.get("branch_data", {}).get("branches_table", []))
         product_count = len(transformed_data.get("product_data", {}).get("products_table", []))
         transaction_link_count = len(transformed_data.get("product_data", {}).get("transaction_product_table", []))
-        logger.info(f"Summary: {record_count} final transaction(s), {branch_count} branch(es), "
-                    f"{product_count} product(s), {transaction_link_count} transaction-product link(s).")
+        logger.info("Summary: %d final transaction(s), %d branch(es), "
+                    "%d product(s), %d transaction-product link(s).",
+                    record_count, branch_count, product_count, transaction_link_count)
 
         # Load data into the database using the consolidated load_data function.
         if using_test_file:
             logger.info("Test mode active. Skipping database upload.")
         else:
             logger.info("Loading transformed data into the database...")
-            load_data(transformed_data)
+            report_progress(70)
+            load_data(transformed_data, get_db_connection())
             logger.info("Data loading completed successfully.")
 
         # If the pipeline completes without raising an exception, return True.
         logger.info("ETL pipeline completed successfully.")
+        report_progress(100)
         return True
     
     except Exception as e:
-        logger.error(f"ETL pipeline failed: {e}")
+        logger.error("ETL pipeline failed: %s", e)
         raise
 
-if __name__ == "__main__":
-    import sys
+def main(file_paths: Optional[List[str]]) -> int:
+    """
+    Runs the ETL pipeline for the given files and reports the outcome on stdout.
+
+    This is the command-line entry point, kept separate from the __main__ block so the
+    pipeline can also be driven in-process.
 
-    file_paths = sys.argv[1:]
+    Args:
+        file_paths (Optional[List[str]]): CSV file paths to process.
 
+    Returns:
+        int: The process exit status: 0 on success or graceful exit, 1 on failure.
+    """
     if not file_paths:
         print("No file paths provided. Exiting without running ETL.")
-        sys.exit(0)
+        return 0
 
     try:
         success = run_etl_pipeline(file_paths)
@@ -112,10 +212,12 @@ if __name__ == "__main__":
             print("ETL pipeline completed successfully.")
         else:
             print("ETL pipeline exited gracefully with no data.")
+        return 0
     except Exception as e:
         print(f"ETL pipeline failed: {e}")
-        sys.exit(1)
-
-
+        return 1
 
+if __name__ == "__main__":
+    import sys
 
+    sys.exit(main(sys.argv[1:]))
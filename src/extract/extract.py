@@ -1,17 +1,309 @@
+import codecs
 import csv
-from io import StringIO
 import os
-from typing import List, Dict, Optional, Union
+import stat
+from functools import lru_cache
+from io import StringIO
+from itertools import islice
+from operator import itemgetter
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple, Union
 import logging
 from utils.logger import get_logger
 from utils.config_loader import load_config
 
 
-logger = get_logger("extract", log_level=logging.DEBUG)  # Creates extract.log
+logger = get_logger("extract", log_level=logging.INFO)  # Creates extract.log
 
 # Load configuration
 config = load_config()
-default_qty = config.get("default_qty", "1")
+default_qty: str = config.get("default_qty", "1")  # Default quantity since not in raw data.
+
+# Expected headers in the raw CSV file, in the order they appear in each row:
+# [Date/Time, Branch, Customer Name, Product, Price, Payment Type, Card Number]
+default_headers: List[str] = config['default_headers']
+
+# Constants derived from the headers once at import rather than on every call or row.
+# Column positions of each field within a raw row.
+_DATE_I, _BRANCH_I, _CUSTOMER_I, _PRODUCT_I, _PRICE_I, _PAYMENT_I, _CARD_I = (
+    default_headers.index(header)
+    for header in ("Date/Time", "Branch", "Customer Name", "Product", "Price", "Payment Type", "Card Number")
+)
+_HEADER_COUNT: int = len(default_headers)
+# Pulls every field out of a stripped row in one C-level call, in the order unpacked by _parse_rows.
+_row_fields = itemgetter(_DATE_I, _BRANCH_I, _CUSTOMER_I, _PRODUCT_I, _PRICE_I, _PAYMENT_I, _CARD_I)
+# Lower-cased header names, used to recognise a header row.
+_EXPECTED_HEADER_VALUES = frozenset(header.strip().lower() for header in default_headers)
+# Bitmasks of the columns that must be non-empty (bit i set = column i required),
+# for card and cash payments respectively.
+_REQUIRED_CARD_MASK: int = (1 << _HEADER_COUNT) - 1
+_REQUIRED_CASH_MASK: int = _REQUIRED_CARD_MASK & ~(1 << _CARD_I)
+
+# Number of parsed records yielded per batch by iter_extract.
+EXTRACT_CHUNK_SIZE: int = 50_000
+# Read buffer for CSV files (1 MiB), so each read syscall covers many rows.
+READ_BUFFER_SIZE: int = 1 << 20
+# Number of bytes sampled from the start of a file to choose its encoding.
+ENCODING_SAMPLE_SIZE: int = 64 * 1024
+# Translation table deleting currency symbols from a price (e.g. "£3.50" -> "3.50").
+_PRICE_TRANS: Dict[int, None] = str.maketrans("", "", "£$€")
+# Codec error handler used when reading CSV files (see _decode_as_cp1252).
+CP1252_FALLBACK_ERRORS: str = "cp1252-fallback"
+
+def _decode_as_cp1252(error: UnicodeDecodeError) -> Tuple[str, int]:
+    """
+    Decodes bytes that are invalid in the file's detected encoding as cp1252 instead.
+
+    The encoding is sniffed from the start of a file only, so a legacy export that is plain
+    ASCII at first and has a "£" or "é" byte further down would otherwise fail mid-read.
+    Registered as the CP1252_FALLBACK_ERRORS codec error handler; a byte that is not valid
+    cp1252 either still raises UnicodeDecodeError.
+
+    Args:
+        error (UnicodeDecodeError): The decoding error raised for the invalid bytes.
+
+    Returns:
+        Tuple[str, int]: The replacement text and the position to resume decoding from.
+    """
+    return error.object[error.start:error.end].decode("cp1252"), error.end
+
+codecs.register_error(CP1252_FALLBACK_ERRORS, _decode_as_cp1252)
+
+def _detect_encoding(path: str) -> str:
+    """
+    Returns the encoding for a CSV file, sniffed once per file version.
+
+    Results are cached by path and modification time, so re-reading an unchanged file
+    (e.g. on a repeated GUI run) does not sample it again. Pipes and other non-regular files
+    are not sampled, since that would consume their data, and are read as UTF-8.
+
+    Args:
+        path (str): Path to the CSV file.
+
+    Returns:
+        str: The encoding to open the file with.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    file_stat = os.stat(path)
+    if not stat.S_ISREG(file_stat.st_mode):
+        return "utf-8"
+    return _sniff_encoding(path, file_stat.st_mtime_ns)
+
+@lru_cache(maxsize=128)
+def _sniff_encoding(path: str, mtime_ns: int) -> str:
+    """
+    Chooses the encoding for a CSV file from a sample of its first bytes.
+
+    Files with a UTF-8 byte order mark (as exported by Excel) get "utf-8-sig" so the BOM is not
+    glued onto the first field; otherwise "utf-8" is used if the sample decodes cleanly, falling
+    back to "cp1252" for legacy Windows exports. The file is then read once with that encoding.
+    Only the sample is checked: bytes later in the file that the chosen encoding cannot decode
+    are decoded as cp1252 while reading (see _decode_as_cp1252).
+
+    Args:
+        path (str): Path to the CSV file.
+        mtime_ns (int): Modification time of the file; only used as part of the cache key.
+
+    Returns:
+        str: The encoding to open the file with.
+    """
+    with open(path, "rb") as raw_file:
+        sample = raw_file.read(ENCODING_SAMPLE_SIZE)
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off by the end of the sample is not an error.
+        if not (len(sample) == ENCODING_SAMPLE_SIZE and e.start >= len(sample) - 3):
+            return "cp1252"
+    return "utf-8"
+
+def _is_canonical_price(price: str) -> bool:
+    """
+    Checks whether a price string is already what f"{float(price):.2f}" would produce,
+    i.e. ASCII digits with exactly two decimals and no redundant leading zero (e.g. "2.50").
+    """
+    return (
+        len(price) >= 4
+        and price[-3] == "."
+        and price.isascii()
+        and price[:-3].isdigit()
+        and price[-2:].isdigit()
+        and (price[0] != "0" or len(price) == 4)
+    )
+
+def _parse_rows(rows: Iterable[List[str]]) -> Iterator[Dict[str, str]]:
+    """
+    Validates raw CSV rows and maps each valid one into a dictionary with snake_case keys.
+
+    Rows are consumed lazily, so the input is never held in memory as a whole.
+
+    The assumed raw CSV order (per row) is:
+        [Date/Time, Branch, Customer Name, Product, Price, Payment Type, Card Number]
+
+    Args:
+        rows (Iterable[List[str]]): Raw rows as produced by csv.reader.
+
+    Yields:
+        Dict[str, str]: Records with keys customer_name, product, qty, price, branch,
+                        payment_type, card_number, date_time.
+    """
+    # Level checks are hoisted out of the loop so filtered-out per-row messages cost nothing.
+    warn_enabled = logger.isEnabledFor(logging.WARNING)
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+    # Payment type has only a handful of distinct values, so the cash check is worked out once
+    # per distinct value and then looked up, like comparing category codes.
+    is_cash_by_payment_type: Dict[str, bool] = {}
+    # Globals and methods used on every row are bound to locals (LOAD_FAST instead of
+    # LOAD_GLOBAL/LOAD_ATTR in the loop).
+    strip = str.strip
+    row_fields = _row_fields
+    is_canonical_price = _is_canonical_price
+    price_trans = _PRICE_TRANS
+    get_is_cash = is_cash_by_payment_type.get
+    cash_mask, card_mask, header_count = _REQUIRED_CASH_MASK, _REQUIRED_CARD_MASK, _HEADER_COUNT
+    qty = default_qty
+
+    # Rows are numbered like csv.DictReader's data rows: blank lines and the header don't count.
+    row_number = 0
+    header_pending = True
+
+    for raw_row in rows:
+        # Strip every field once up front (map runs in C); all checks and the mapping below use the stripped values.
+        row = list(map(strip, raw_row))
+
+        # Skip blank lines, as csv.DictReader did.
+        if not row:
+            continue
+
+        # If the first non-blank row contains headers (ignoring case and whitespace), skip it.
+        # The first cell is checked before building a set, so a data row is rejected with one lookup.
+        if header_pending:
+            header_pending = False
+            if (row[0].lower() in _EXPECTED_HEADER_VALUES
+                    and {val.lower() for val in row} == _EXPECTED_HEADER_VALUES):
+                logger.info("Detected header row in file; skipping it.")
+                continue
+
+        row_number += 1
+        # Pad short rows so missing trailing fields are treated as empty.
+        if len(row) < header_count:
+            row += [""] * (header_count - len(row))
+
+        date_time, branch, customer_name, product, raw_price, payment_type, card_number = row_fields(row)
+
+        # Normalize the payment type.
+        is_cash = get_is_cash(payment_type)
+        if is_cash is None:
+            is_cash = is_cash_by_payment_type[payment_type] = payment_type.upper() == "CASH"
+
+        # Check that all required fields are present and non-empty with a single mask compare.
+        # If payment type is cash, "Card Number" is not required.
+        # If any required field is missing or empty, skip the row.
+        present = 0
+        for i, value in enumerate(row):
+            if value:
+                present |= 1 << i
+        missing = (cash_mask if is_cash else card_mask) & ~present
+        if missing:
+            if warn_enabled:
+                # Report the first missing column (the lowest set bit).
+                missing_index = (missing & -missing).bit_length() - 1
+                logger.warning("Row %d skipped due to missing or empty field '%s': %s",
+                               row_number, default_headers[missing_index], row)
+            continue
+
+        if is_canonical_price(raw_price):
+            # Already formatted to two decimals (typical of POS exports), so use it as is.
+            price: str = raw_price
+        else:
+            try:
+                # Drop any currency symbol, convert the Price field to a float and format it to two decimals.
+                price = format(float(raw_price.translate(price_trans)), ".2f")
+            except ValueError:
+                if warn_enabled:
+                    logger.warning("Row %d skipped due to invalid price value: %s", row_number, raw_price)
+                continue
+
+        # Reorder and rename keys using snake_case.
+        # The card number is blank for cash payments.
+        mapped_row: Dict[str, str] = {
+            "customer_name": customer_name,
+            "product": product,
+            "qty": qty,  # Default quantity since not in raw data.
+            "price": price,
+            "branch": branch,
+            "payment_type": payment_type,
+            "card_number": "" if is_cash else card_number,
+            "date_time": date_time
+        }
+        if debug_enabled:
+            logger.debug("Mapped row: %s", mapped_row)
+        yield mapped_row
+
+def _batched(records: Iterator[Dict[str, str]], size: int) -> Iterator[List[Dict[str, str]]]:
+    """Yields successive lists of at most size records."""
+    while batch := list(islice(records, size)):
+        yield batch
+
+def iter_records(file_input: Union[str, StringIO]) -> Iterator[Dict[str, str]]:
+    """
+    Streams records from a CSV file (or file-like object) one at a time.
+
+    The file is read line by line, so nothing beyond the current row is held in memory, and
+    callers that only iterate once never pay for a list of every record.
+    The encoding of a file path is detected once up front (see _detect_encoding).
+    Records are validated and mapped exactly as in extract_data.
+
+    Args:
+        file_input (Union[str, StringIO]): Either a file path (str) or a file-like object containing the CSV data.
+
+    Yields:
+        Dict[str, str]: Records with snake_case keys.
+
+    Raises:
+        FileNotFoundError: If file_input is a path that does not exist.
+        TypeError: If file_input is neither a path nor a StringIO.
+    """
+    if isinstance(file_input, str):
+        encoding = _detect_encoding(file_input)
+        with open(file_input, mode="r", newline="", encoding=encoding, errors=CP1252_FALLBACK_ERRORS,
+                  buffering=READ_BUFFER_SIZE) as csv_file:
+            # The file is read front to back once; let the kernel read ahead aggressively on cold cache.
+            # The advice is optional: it fails for pipes (e.g. a FIFO), which are read as is.
+            if hasattr(os, "posix_fadvise"):
+                try:
+                    os.posix_fadvise(csv_file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                except OSError:
+                    pass
+            yield from _parse_rows(csv.reader(csv_file))
+    elif isinstance(file_input, StringIO):
+        yield from _parse_rows(csv.reader(file_input))
+    else:
+        raise TypeError("Invalid file input type. Expected a file path (str) or file-like object (StringIO).")
+
+def iter_extract(file_input: Union[str, StringIO],
+                 chunk_size: int = EXTRACT_CHUNK_SIZE) -> Iterator[List[Dict[str, str]]]:
+    """
+    Streams records from a CSV file (or file-like object) in batches of at most chunk_size.
+
+    Memory use is bounded by the batch size rather than the file size, and callers can start
+    processing the first batch before the file is fully read.
+
+    Args:
+        file_input (Union[str, StringIO]): Either a file path (str) or a file-like object containing the CSV data.
+        chunk_size (int): Maximum number of records per yielded batch.
+
+    Yields:
+        List[Dict[str, str]]: Batches of records with snake_case keys.
+
+    Raises:
+        FileNotFoundError: If file_input is a path that does not exist.
+        TypeError: If file_input is neither a path nor a StringIO.
+    """
+    yield from _batched(iter_records(file_input), chunk_size)
 
 def extract_data(file_input: Union[str, StringIO], has_header: bool = True) -> Optional[List[Dict[str, str]]]:
     """
@@ -24,6 +316,8 @@ def extract_data(file_input: Union[str, StringIO], has_header: bool = True) -> O
     The function outputs records with keys:
         customer_name, product, qty, price, branch, payment_type, card_number, date_time
 
+    This collects every record from iter_records; use iter_records or iter_extract directly to stream large files.
+
     Args:
         file_input (Union[str, StringIO]): Either a file path (str) or a file-like object containing the CSV data.
 
@@ -33,111 +327,26 @@ def extract_data(file_input: Union[str, StringIO], has_header: bool = True) -> O
     Raises:
         Exception: If an unexpected error occurs during extraction.
     """
-    # Load defaults from the configuration file
-    # Define the expected headers in the raw CSV file (as they appear in the file).
-    # Assumed raw order per row: [Date/Time, Branch, Customer Name, Product, Price, Payment Type, Card Number]
-    default_headers: List[str] = config['default_headers']
-
-    # We want to output dictionaries with keys in snake_case:
-    #   customer_name, product, qty, price, branch, payment_type, card_number, date_time
-
-    # Default quantity
-    default_qty: str = config['default_qty']
-
     try:
-        # Obtain a file-like object.
         if isinstance(file_input, str):
-            if not os.path.exists(file_input):
-                logger.error(f"File not found: {file_input}")
-                return None
-            logger.info(f"Extracting data from {file_input}...")
-            with open(file_input, mode="r", newline="", encoding="utf-8") as csv_file:
-                reader = csv.DictReader(csv_file, fieldnames=default_headers)
-                raw_data: List[Dict[str, str]] = list(reader)
-
+            # No existence pre-check: open() raises FileNotFoundError, handled below.
+            logger.info("Extracting data from %s...", file_input)
         elif isinstance(file_input, StringIO):
             logger.info("Extraction taking place")
-            reader = csv.DictReader(file_input, fieldnames=default_headers)
-            raw_data: List[Dict[str, str]] = list(reader)
         else:
             logger.error("Invalid file input type. Expected a file path (str) or file-like object (StringIO).")
             return None
 
-        # If the first row contains headers (ignoring case and whitespace), skip it.
-        if raw_data:
-            first_row_vals = {str(val).strip().lower() for val in raw_data[0].values()}
-            expected_vals = {header.strip().lower() for header in default_headers}
-            if first_row_vals == expected_vals:
-                logger.info("Detected header row in file; skipping it.")
-                raw_data = raw_data[1:]
-
-        parsed_data: List[Dict[str, str]] = []
-        for row_number, row in enumerate(raw_data, start=1):
-            # Retrieve and normalize the payment type.
-            try:
-                payment_type: str = row["Payment Type"].strip()
-            except KeyError:
-                logger.warning(f"Row {row_number} skipped due to missing 'Payment Type': {row}")
-                continue
-                    
-            # Define the list of required headers.
-            # If payment type is cash, exclude "Card Number" from required fields.
-            if payment_type.upper() == "CASH":
-                required_fields = [header for header in default_headers if header != "Card Number"]
-            else:
-                required_fields = default_headers
-
-            # Check that all required fields are present and non-empty.
-            # If any required field is missing or empty, skip the row.
-            missing_field = False
-            for header in required_fields:
-                if header not in row or not row[header].strip():
-                    logger.warning(f"Row {row_number} skipped due to missing or empty field '{header}': {row}")
-                    missing_field = True
-                    break
-            if missing_field:
-                continue
+        parsed_data: List[Dict[str, str]] = list(iter_records(file_input))
 
-            try:
-                try:
-                    # Convert the Price field to a float and then format it to two decimals.
-                    price: str = f"{float(row['Price'].strip()):.2f}"
-                except ValueError:
-                    logger.warning(f"Row {row_number} skipped due to invalid price value: {row['Price']}")
-                    continue
-
-                # Determine the card number: if payment_type is cash, use an empty string.
-                card_number: str = row["Card Number"].strip() if payment_type.upper() != "CASH" else ""
-
-                # Reorder and rename keys using snake_case.
-                mapped_row: Dict[str, str] = {
-                    "customer_name": row["Customer Name"].strip(),
-                    "product": row["Product"].strip(),
-                    "qty": default_qty,  # Default quantity since not in raw data.
-                    "price": price,
-                    "branch": row["Branch"].strip(),
-                    "payment_type": payment_type,
-                    "card_number": card_number,
-                    "date_time": row["Date/Time"].strip()
-                }
-                logger.debug(f"Mapped row: {mapped_row}")
-                parsed_data.append(mapped_row)
-            except KeyError as e:
-                logger.warning(f"Row {row_number} skipped due to missing field: {e}")
-
-        logger.info(f"Successfully extracted {len(parsed_data)} rows from {file_input}.")
+        logger.info("Successfully extracted %d rows from %s.", len(parsed_data), file_input)
         if parsed_data:
-            logger.debug(f"Sample extracted row: {parsed_data[0]}")
+            logger.debug("Sample extracted row: %s", parsed_data[0])
         return parsed_data
 
     except FileNotFoundError:
-        logger.error(f"The file {file_input} was not found. Please ensure it exists in the 'data/' directory.")
-        raise
+        logger.error("The file %s was not found. Please ensure it exists in the 'data/' directory.", file_input)
+        return None
     except Exception as e:
-        logger.error(f"Extraction failed: {e}")
+        logger.error("Extraction failed: %s", e)
         raise
-
-
-
- 
-  
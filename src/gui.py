@@ -2,10 +2,17 @@ import os
 import platform
 import sys
 from dotenv import load_dotenv
-# Load environment variables for Windows-specific Tk/Tcl paths
-load_dotenv("db/.env")
+# Load environment variables for Windows-specific Tk/Tcl paths. The ETL subprocess inherits
+# them, so the flag lets app.py skip reading the file again.
+# The path is resolved from this file rather than the working directory, and the flag is only
+# set once the file has actually been read, so the db module's own lookup still runs otherwise.
+if not os.environ.get("ETL_ENV_LOADED"):
+    if load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", ".env")):
+        os.environ["ETL_ENV_LOADED"] = "1"
 
-if platform.system() == "Windows":
+IS_WINDOWS: bool = platform.system() == "Windows"
+
+if IS_WINDOWS:
     tcl_path = os.getenv("TCL_LIBRARY")
     tk_path = os.getenv("TK_LIBRARY")
 
@@ -16,13 +23,23 @@ if platform.system() == "Windows":
     os.environ["TK_LIBRARY"] = tk_path
 
 print("Running from:", sys.executable)
-from typing import Optional, List
+from typing import Any, Callable, Dict, Optional, List, Tuple
+from collections import deque
 import threading
 import subprocess
 import time
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 
+# How often (in milliseconds) queued log messages are flushed into the log widget.
+LOG_FLUSH_INTERVAL_MS: int = 200
+# Maximum number of lines kept in the log widget; older lines are dropped.
+MAX_LOG_LINES: int = 5000
+# Marker that starts the progress lines printed by src/app.py, e.g. "PROGRESS 40" (in percent).
+# It is handed to the pipeline in the ETL_PROGRESS_MARKER environment variable, so this is the
+# only place it is defined.
+PROGRESS_MARKER: str = "PROGRESS"
+
 class ETLApp:
     def __init__(self, root: tk.Tk, test_mode: bool = False) -> None:
         """
@@ -40,6 +57,20 @@ class ETLApp:
         self.etl_thread = None
         self.stop_event = threading.Event()
         self.process = None
+        # Log messages from any thread; drained into the widget on the Tk main loop.
+        # Bounded like the widget itself, so a burst of output cannot grow memory without limit.
+        self._log_queue: "deque[str]" = deque(maxlen=MAX_LOG_LINES)
+        # Second and formatted timestamp of the most recent log message.
+        self._last_log_second: int = 0
+        self._last_log_timestamp: str = ""
+        # Widget updates requested from the worker thread, run on the Tk main loop by _drain_logs.
+        self._ui_calls: "deque[Tuple[Callable[..., Any], Dict[str, Any]]]" = deque()
+        # Latest progress reported by the pipeline; applied to the progress bar with the log flush.
+        self._progress_value: int = 0
+        if not self.test_mode:
+            self.root.after(LOG_FLUSH_INTERVAL_MS, self._drain_logs)
+        # Closing the window stops a running ETL subprocess instead of leaving it orphaned.
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def create_menu(self) -> None:
         """
@@ -118,11 +149,14 @@ class ETLApp:
         self.selected_files_label.pack(pady=(5, 10))
 
         
-        self.progress = ttk.Progressbar(control_frame, orient="horizontal", mode="indeterminate", length=150)
+        self.progress = ttk.Progressbar(control_frame, orient="horizontal", mode="determinate", maximum=100,
+                                        length=150)
         self.progress.pack(pady=10)
         
         # Log frame widgets
-        self.log_text = tk.Text(log_frame, wrap="word")
+        # Read-only and without undo history, so inserts skip undo bookkeeping.
+        self.log_text = tk.Text(log_frame, wrap="word", undo=False, autoseparators=False, maxundo=0,
+                                state="disabled")
         self.log_text.pack(side="left", fill="both", expand=True)
         
         scrollbar = tk.Scrollbar(log_frame, command=self.log_text.yview)
@@ -143,9 +177,9 @@ class ETLApp:
             )
         )
         if file_paths:
-            display_paths = "\n".join([os.path.basename(path) for path in file_paths])
+            display_paths = "\n".join(map(os.path.basename, file_paths))
             self.selected_files_label.config(text=f"Selected file(s):\n{display_paths}")
-            self.start_etl(list(file_paths))
+            self.start_etl(file_paths)
         else:
             self.selected_files_label.config(text="Selected file(s): None")
             messagebox.showwarning("No Selection", "No files were selected.")
@@ -156,7 +190,7 @@ class ETLApp:
 
         This method ensures that each ETL run begins with a clean state by clearing any
         previous stop flags. It then disables the Run button, enables the Stop button,
-        updates the status label, shows the progress bar, and starts a new thread to
+        updates the status label, resets the progress bar, and starts a new thread to
         run the ETL subprocess asynchronously.
 
         Args:
@@ -167,11 +201,13 @@ class ETLApp:
         self.run_button.config(state="disabled")
         self.stop_button.config(state="normal")
         self.status_label.config(text="Status: Running programme...")
-        self.progress.start(10)
+        self._progress_value = 0
+        self.progress["value"] = 0
         self.log("Starting programme...")
 
-        # Start the ETL pipeline in a separate thread to keep the GUI responsive
-        self.etl_thread = threading.Thread(target=self.run_etl_pipeline, args=(file_paths,))
+        # Start the ETL pipeline in a separate daemon thread to keep the GUI responsive;
+        # as a daemon it never keeps the application alive after the window is closed.
+        self.etl_thread = threading.Thread(target=self.run_etl_pipeline, args=(file_paths,), daemon=True)
         self.etl_thread.start()
 
     # def stop_etl(self):
@@ -191,8 +227,11 @@ class ETLApp:
         Attempts to stop the currently running ETL subprocess.
 
         This method checks if the ETL thread (self.etl_thread) is still alive,
-        and if so, sets a thread-safe stop_event flag to signal the ETL loop to exit.
-        If a subprocess (self.process) is still active, it attempts to terminate it using .terminate().
+        and if so, sets the thread-safe stop_event flag and terminates the subprocess
+        (self.process) if it is still active. Terminating the process closes its output,
+        which ends run_etl_pipeline's read loop; the flag then marks the run as interrupted.
+        If Stop is pressed before the process has been launched, run_etl_pipeline sees the
+        flag right after Popen returns and terminates the process itself.
 
         After attempting to stop the process, this method also resets GUI buttons and status indicators.
 
@@ -265,12 +304,17 @@ class ETLApp:
         provided CSV file paths via subprocess.Popen(), and stores the process reference in
         self.process so it can be terminated later by the stop_etl() method.
 
+        The pipeline's output (stdout and stderr merged) is streamed into the log line by line
+        as it is produced, rather than collected and logged in one block when the run ends.
+        The child runs unbuffered (-u) so its lines arrive immediately, and is asked to print
+        progress lines by setting ETL_PROGRESS_MARKER in its environment.
+
         Args:
             file_paths (Optional[List[str]]): List of CSV file paths selected by the user.
             If None, the app will run on the default dataset defined inside app.py.
         """
         try:
-            command = [sys.executable, "src/app.py"]
+            command = [sys.executable, "-u", "src/app.py"]
             if file_paths:
                 command.extend(file_paths)
 
@@ -281,53 +325,151 @@ class ETLApp:
             self.process = subprocess.Popen(
                 command,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+                env={**os.environ, "ETL_PROGRESS_MARKER": PROGRESS_MARKER}
             )
-
-            # Wait loop with cancellation support
-            while True:
-                if self.stop_event.is_set():
-                    self.log("ETL pipeline interrupted by user.")
-                    self.process.terminate()
-                    break
-
-                retcode = self.process.poll()
-                if retcode is not None:  # Process finished
-                    stdout, stderr = self.process.communicate()
-                    if stdout:
-                        self.log(stdout)
-                    if stderr:
-                        self.log("Errors:\n" + stderr)
-
-                    if retcode == 0:
-                        self.log("ETL pipeline finished successfully!")
-                        self.status_label.config(text="Status: Completed")
-                    else:
-                        self.log("ETL pipeline failed!")
-                        self.status_label.config(text="Status: Error")
-                    break
-
-                time.sleep(0.2)
+            # Stop may have been pressed while the process was starting, before stop_etl()
+            # could see it; stop_etl() sets the flag before it looks at self.process.
+            if self.stop_event.is_set():
+                self.process.terminate()
+
+            # Stream output until the process exits; stop_etl() terminating the process
+            # closes the pipe and ends the loop.
+            for line in self.process.stdout:
+                # Progress lines drive the progress bar and are not shown in the log.
+                if not self._track_progress(line):
+                    self.log(line.rstrip("\n"))
+            retcode = self.process.wait()
+
+            if self.stop_event.is_set():
+                self.log("ETL pipeline interrupted by user.")
+            elif retcode == 0:
+                self.log("ETL pipeline finished successfully!")
+                self._call_in_ui(self.status_label.config, text="Status: Completed")
+            else:
+                self.log("ETL pipeline failed!")
+                self._call_in_ui(self.status_label.config, text="Status: Error")
 
         except Exception as ex:
             self.log("Unexpected error: " + str(ex))
-            self.status_label.config(text="Status: Error")
+            self._call_in_ui(self.status_label.config, text="Status: Error")
         finally:
-            self.run_button.config(state="normal")
-            self.stop_button.config(state="disabled")
-            self.progress.stop()
-            self.status_label.config(text="Status: Idle")
+            self._call_in_ui(self.run_button.config, state="normal")
+            self._call_in_ui(self.stop_button.config, state="disabled")
+            self._call_in_ui(self.status_label.config, text="Status: Idle")
+
+    def _call_in_ui(self, func: Callable[..., Any], **kwargs: Any) -> None:
+        """
+        Schedules a widget update to run on the Tk main loop.
+
+        Tk is not thread-safe, so the worker thread never touches widgets directly; the call is
+        queued and run by _drain_logs(). In test mode there is no main loop, so it runs at once.
+
+        Args:
+            func (Callable[..., Any]): The widget method to call, e.g. self.status_label.config.
+            **kwargs (Any): Keyword arguments passed to func.
+        """
+        if self.test_mode:
+            func(**kwargs)
+        else:
+            self._ui_calls.append((func, kwargs))
+
+    def _track_progress(self, line: str) -> bool:
+        """
+        Updates the recorded progress from a "PROGRESS <percent>" line printed by the pipeline.
+
+        Only a number is stored here; _drain_logs() applies it to the progress bar on the
+        Tk main loop, so the bar is redrawn at most once per flush however fast lines arrive.
+        Progress never moves backwards.
+
+        Args:
+            line (str): A line of output from the ETL subprocess.
+
+        Returns:
+            bool: True if the line was a progress line, otherwise False.
+        """
+        parts = line.split()
+        if len(parts) != 2 or parts[0] != PROGRESS_MARKER:
+            return False
+        try:
+            value = int(parts[1])
+        except ValueError:
+            return False
+        self._progress_value = max(self._progress_value, min(value, 100))
+        return True
+
+    def on_close(self) -> None:
+        """
+        Handles the window being closed.
+
+        Any running ETL subprocess is stopped via stop_etl() before the window is destroyed,
+        so no pipeline keeps running in the background after the GUI exits.
+
+        Returns:
+            None
+        """
+        self.stop_etl()
+        self.root.destroy()
 
     def log(self, message: str) -> None:
-        # Append log messages with a timestamp to the log_text widget
-        timestamp = time.strftime("[%Y-%m-%d %H:%M:%S]")
-        full_msg = "end", f"{timestamp} {message}\n"
+        """
+        Queues a timestamped log message for display.
+
+        Safe to call from the worker thread: the message is only appended to a deque, and
+        _drain_logs() writes queued messages to the widget from the Tk main loop.
+
+        Args:
+            message (str): The message to log.
+        """
+        # Format the timestamp only when the second changes; bursts of lines reuse it.
+        now = int(time.time())
+        if now != self._last_log_second:
+            self._last_log_timestamp = time.strftime("[%Y-%m-%d %H:%M:%S]", time.localtime(now))
+            self._last_log_second = now
+        full_msg = f"{self._last_log_timestamp} {message}\n"
         if self.test_mode:
             print(full_msg)  # Visible in pytest terminal output
         else:
-            self.log_text.insert("end", full_msg)
-            self.log_text.see("end")  
+            self._log_queue.append(full_msg)
+
+    def _drain_logs(self) -> None:
+        """
+        Writes all queued log messages to the log widget in a single insert, then applies
+        widget updates queued by the worker thread and the latest progress.
+
+        Runs every LOG_FLUSH_INTERVAL_MS on the Tk main loop. Once the widget holds more than
+        MAX_LOG_LINES lines, the oldest lines are deleted so long runs do not slow the GUI down.
+        """
+        # deque.popleft is atomic, so this is safe while the worker thread keeps appending.
+        batch: List[str] = []
+        try:
+            while True:
+                batch.append(self._log_queue.popleft())
+        except IndexError:
+            pass
+
+        if batch:
+            self.log_text.configure(state="normal")
+            self.log_text.insert("end", "".join(batch))
+            line_count = int(self.log_text.index("end-1c").split(".")[0])
+            if line_count > MAX_LOG_LINES:
+                self.log_text.delete("1.0", f"{line_count - MAX_LOG_LINES + 1}.0")
+            self.log_text.configure(state="disabled")
+            self.log_text.see("end")
+
+        try:
+            while True:
+                func, kwargs = self._ui_calls.popleft()
+                func(**kwargs)
+        except IndexError:
+            pass
+
+        if self.progress["value"] != self._progress_value:
+            self.progress["value"] = self._progress_value
+
+        self.root.after(LOG_FLUSH_INTERVAL_MS, self._drain_logs)
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -1,9 +1,33 @@
 import logging
-from typing import List, Dict
+from typing import List, Dict, Any, FrozenSet, Set, Tuple, Hashable
 from utils.logger import get_logger
 
 logger = get_logger("remove_duplicates", log_level=logging.DEBUG)
 
+def _freeze(value: Any) -> Hashable:
+    """
+    Converts a record value into a hashable equivalent for use in a deduplication key.
+
+    Lists become tuples (with any dicts inside them frozen as item frozensets), and dicts
+    become item frozensets. Other values are returned unchanged.
+    """
+    if isinstance(value, list):
+        # If it's a list of dicts, convert each dict to a frozenset of its items
+        if all(isinstance(item, dict) for item in value):
+            return tuple(frozenset(item.items()) for item in value)
+        return tuple(value)
+    if isinstance(value, dict):
+        return frozenset(value.items())
+    return value
+
+def _row_key(row: Dict[str, Any]) -> FrozenSet[Tuple[str, Hashable]]:
+    """
+    Builds the deduplication key of a record: a frozenset of its items with nested values frozen.
+
+    A frozenset of items is order-independent without sorting the keys of every row.
+    """
+    return frozenset((k, _freeze(v)) for k, v in row.items())
+
 def deduplicate_data(data: List[Dict[str, str]]) -> List[Dict[str, str]]:
     """
     Removes duplicate records from data.
@@ -11,6 +35,11 @@ def deduplicate_data(data: List[Dict[str, str]]) -> List[Dict[str, str]]:
     Two records are considered duplicates if all key-value pairs match exactly.
     The function returns only unique records.
 
+    Records carrying an "id" (assigned upstream as a primary key) are compared by that id
+    alone, since two records with the same id are the same record; this hashes one string
+    instead of every field. Records without an id are compared on all their fields, through
+    a set of their frozen keys.
+
     Args:
         data (List[Dict[str, str]]): List of data rows.
 
@@ -19,30 +48,26 @@ def deduplicate_data(data: List[Dict[str, str]]) -> List[Dict[str, str]]:
     Raises:
         Exception: If an unexpected error occurs during removal of duplicates.
     """
-    seen: Set[Tuple[Tuple[str, str], ...]] = set()
+    seen: Set[FrozenSet[Tuple[str, Hashable]]] = set()
+    seen_ids: Set[str] = set()
     unique_data: List[Dict[str, Any]] = []
 
     try:
         logger.info("Starting removal of duplicate data...")
         for row in data:
-            safe_row = {}
-            for k, v in row.items():
-                if isinstance(v, list):
-                    # If it's a list of dicts, convert each dict to sorted tuple
-                    if all(isinstance(item, dict) for item in v):
-                        v = tuple(tuple(sorted(item.items())) for item in v)
-                    else:
-                        v = tuple(v)
-                elif isinstance(v, dict):
-                    v = tuple(sorted(v.items()))
-                safe_row[k] = v
-
-            unique_key = tuple(sorted(safe_row.items()))
+            record_id = row.get("id")
+            if record_id:
+                if record_id not in seen_ids:
+                    seen_ids.add(record_id)
+                    unique_data.append(row)
+                continue
+
+            unique_key = _row_key(row)
             if unique_key not in seen:
                 seen.add(unique_key)
                 unique_data.append(row)
-        logger.info(f"Duplicates removed. {len(unique_data)} unique rows remaining.")
+        logger.info("Duplicates removed. %d unique rows remaining.", len(unique_data))
         return unique_data
     except Exception as e:
-        logger.error(f"Error during the removal of duplicates: {e}")
+        logger.error("Error during the removal of duplicates: %s", e)
         raise
@@ -1,21 +1,42 @@
 import logging
-from typing import List, Dict
+from typing import Iterable, Iterator, List, Dict
 from utils.logger import get_logger
-import copy
 
 logger = get_logger("remove_sensitive_data", log_level=logging.DEBUG)
 
+# Fields removed when the caller does not specify any (the snake_case keys produced by extract).
+DEFAULT_SENSITIVE_FIELDS: List[str] = ['customer_name', 'card_number']
+
+def iter_remove_pii(data: Iterable[Dict[str, str]], sensitive_fields: List[str] = None) -> Iterator[Dict[str, str]]:
+    """
+    Lazily yields a copy of each record without the specified sensitive fields (PII).
+
+    Unlike remove_pii, no list of cleaned records is built, so a caller that makes a single
+    pass (such as transform_data) only holds one cleaned record at a time.
+
+    Args:
+        data (Iterable[Dict[str, str]]): Raw data rows.
+        sensitive_fields (List[str], optional): List of fields to remove sensitive information.
+            Defaults to DEFAULT_SENSITIVE_FIELDS.
+
+    Yields:
+        Dict[str, str]: Records with sensitive fields removed; the input is not modified.
+    """
+    sensitive = frozenset(DEFAULT_SENSITIVE_FIELDS if sensitive_fields is None else sensitive_fields)
+    # Record values are flat strings, so a shallow copy per record is enough.
+    return ({k: v for k, v in record.items() if k not in sensitive} for record in data)
+
 def remove_pii(data: List[Dict[str, str]], sensitive_fields: List[str] = None) -> List[Dict[str, str]]:
     """
     Removes specified sensitive fields (PII) (i.e., customer_name and card_number) from the provided dataset.
 
-    This function iterates over the list of records (each record as a dict) and removes
-    the keys 'customer_name' and 'card_number' if they exist.
+    This function builds a shallow copy of each record (each record as a dict) without
+    the keys 'customer_name' and 'card_number' if they exist; the input is not modified.
     
     Args:
         data (List[Dict[str, str]]): List of raw data rows.
         sensitive_fields (List[str], optional): List of fields to remove sensitive information.
-            Defaults to ['Customer Name', 'Card Number'].
+            Defaults to DEFAULT_SENSITIVE_FIELDS.
 
     Returns:
         List[Dict[str, str]]: Data with sensitive fields removed.
@@ -25,21 +46,14 @@ def remove_pii(data: List[Dict[str, str]], sensitive_fields: List[str] = None) -
     try:
         # Use default fields if none are specified
         if sensitive_fields is None:
-            sensitive_fields = ['Customer Name', 'Card Number']
+            sensitive_fields = DEFAULT_SENSITIVE_FIELDS
 
         logger.info(f"Removing sensitive fields: {sensitive_fields}")
 
-        # Make a deep copy of the data to avoid modifying the original data
-        data_copy = copy.deepcopy(data)
-
-        # Process each record and remove sensitive fields
-        for record in data_copy:
-            for field in sensitive_fields:
-                if field in record:
-                    del record[field]
-                    logger.debug(f"Removed {field} from record.")
+        data_copy = list(iter_remove_pii(data, sensitive_fields))
 
         logger.info(f"Successfully removed sensitive fields from {len(data)} records.")
         return data_copy
     except Exception as e:
-        logger.error(f"Error while removing sensitive information: {e}")
\ No newline at end of file
+        logger.error(f"Error while removing sensitive information: {e}")
+        raise
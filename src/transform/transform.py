@@ -1,19 +1,29 @@
-from uuid import uuid4
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import csv
 import os
 import logging
-from typing import List, Dict, Any, Tuple
+from operator import itemgetter
+from typing import List, Dict, Any, FrozenSet, Tuple, Iterator, Optional
+from uuid import uuid4
 from utils.logger import get_logger
 from utils.config_loader import load_config
-from src.transform.remove_sensitive_data import remove_pii
+from src.transform.remove_sensitive_data import iter_remove_pii
 from src.transform.remove_duplicates import deduplicate_data
 
 logger = get_logger("transform", log_level=logging.DEBUG)
 
 config = load_config()  # Load the default config.json file
 
-# Recognised sizes (only volume sizes)
-known_sizes = config['known_sizes']
+# Recognised sizes (only volume sizes), lower-cased into a frozenset for O(1) membership checks.
+known_sizes: FrozenSet[str] = frozenset(size.lower() for size in config['known_sizes'])
+
+# Fields every transaction must have, and a getter fetching all of them in one C-level call.
+REQUIRED_FIELDS: Tuple[str, ...] = tuple(config["required_fields"])
+_required_values = itemgetter(*REQUIRED_FIELDS)
+
+# Write buffer for output CSV files (1 MiB).
+WRITE_BUFFER_SIZE: int = 1 << 20
 
 def standardise_product_name(name: str) -> str:
     """
@@ -27,6 +37,91 @@ def standardise_product_name(name: str) -> str:
     """
     return name.lower().strip()
 
+@lru_cache(maxsize=100_000)
+def _parse_entry(entry: str) -> Optional[Dict[str, Any]]:
+    """
+    Parses a single stripped product entry, e.g. "Large Latte - Hazelnut - 2.45".
+
+    Entries recur across many different product fields (the same item ordered alongside
+    different others), so results are cached per distinct entry; callers must not change
+    the returned dict. Warnings about a malformed entry are therefore logged once.
+
+    Args:
+        entry (str): One comma-separated entry of a product field.
+
+    Returns:
+        Optional[Dict[str, Any]]: The entry's size, product_name, flavour and price,
+        or None if the entry is malformed.
+    """
+    parts = entry.split(" - ", maxsplit=2)
+    if len(parts) == 2:
+        # Simple format: "Product Name - Price"
+        product_name = standardise_product_name(parts[0])
+        size = ""
+        flavour = ""
+        try:
+            price_val: float = float(parts[1].strip())
+        except ValueError:
+            logger.warning("Invalid price '%s' in entry '%s'.", parts[1], entry)
+            return None
+    elif len(parts) >= 3:
+        tokens = parts[0].split()
+        if tokens and tokens[0].lower() in known_sizes:
+            size = tokens[0].lower()
+            product_name = standardise_product_name(" ".join(tokens[1:]))
+        else:
+            size = ""
+            product_name = standardise_product_name(parts[0])
+        if len(parts) == 3:
+            flavour = parts[1].strip()
+        else:
+            flavour = " ".join(parts[1:-1]).strip()
+        try:
+            price_val = float(parts[-1].strip())
+        except ValueError:
+            logger.warning("Invalid price '%s' in entry '%s'.", parts[-1], entry)
+            return None
+    else:
+        logger.warning("Skipping product entry '%s' due to unexpected format.", entry)
+        return None
+
+    return {
+        "size": size,
+        "product_name": product_name,
+        "flavour": flavour,
+        "price": price_val
+    }
+
+@lru_cache(maxsize=4096)
+def _parse_product_entries(product_field: str) -> Tuple[Tuple[Dict[str, Any], ...], float]:
+    """
+    Parses a stripped, non-empty product field into its product entries and their total price.
+
+    Product fields repeat heavily (a café sells a limited set of items and combinations), so
+    results are cached per distinct field; callers must copy the returned dicts before changing them.
+    Each entry is parsed by _parse_entry, which is cached per distinct entry, so a new
+    combination of known items costs only dictionary lookups.
+
+    Args:
+        product_field (str): The product field, e.g. "Large Latte - Hazelnut - 2.45, Tea - 1.20".
+
+    Returns:
+        Tuple[Tuple[Dict[str, Any], ...], float]: The parsed entries and the sum of their prices.
+    """
+    # If multiple entries are present, split by commas; otherwise create a list with one entry.
+    entries = [entry.strip() for entry in product_field.split(",")] if "," in product_field else [product_field]
+    parsed_products = []
+    total_price: float = 0.0
+
+    for entry in entries:
+        product = _parse_entry(entry)
+        if product is None:
+            continue
+        parsed_products.append(product)
+        total_price += product["price"]
+
+    return tuple(parsed_products), total_price
+
 def parse_product_field(record: Dict[str, str]) -> Dict[str, Any]:
     """
     Parses the 'product' field to extract product details - size, product_name, flavour and price.
@@ -43,6 +138,7 @@ def parse_product_field(record: Dict[str, str]) -> Dict[str, Any]:
     
     The parsed result is stored under a new key "parsed_products" (a list of dicts), and
     the record's overall "price" field is updated to the sum of all parsed prices.
+    Parsing is memoised per distinct product field (see _parse_product_entries).
     
     Args:
         record (Dict[str, str]): A transaction record with a "product" field.
@@ -55,60 +151,33 @@ def parse_product_field(record: Dict[str, str]) -> Dict[str, Any]:
         if not product_field:
             return record
 
-        # If multiple entries are present, split by commas; otherwise create a list with one entry.
-        entries = [entry.strip() for entry in product_field.split(",")] if "," in product_field else [product_field]
-        parsed_products = []
-        total_price: float = 0.0
-
-        for entry in entries:
-            parts = entry.split(" - ", maxsplit=2)
-            if len(parts) == 2:
-                # Simple format: "Product Name - Price"
-                product_name = standardise_product_name(parts[0])
-                size = ""
-                flavour = ""
-                try:
-                    price_val: float = float(parts[1].strip())
-                except ValueError:
-                    logger.warning(f"Invalid price '{parts[1]}' in entry '{entry}'.")
-                    continue
-            elif len(parts) >= 3:
-                tokens = parts[0].split()
-                if tokens and tokens[0].lower() in known_sizes:
-                    size = tokens[0].lower()
-                    product_name = standardise_product_name(" ".join(tokens[1:]))
-                else:
-                    size = ""
-                    product_name = standardise_product_name(parts[0])
-                if len(parts) == 3:
-                    flavour = parts[1].strip()
-                else:
-                    flavour = " ".join(parts[1:-1]).strip()
-                try:
-                    price_val = float(parts[-1].strip())
-                except ValueError:
-                    logger.warning(f"Invalid price '{parts[-1]}' in entry '{entry}'.")
-                    continue
-            else:
-                logger.warning(f"Skipping product entry '{entry}' due to unexpected format.")
-                continue
-
-            parsed_products.append({
-                "size": size,
-                "product_name": product_name,
-                "flavour": flavour,
-                "price": price_val
-            })
-            total_price += price_val
+        parsed_products, total_price = _parse_product_entries(product_field)
 
         if parsed_products:
-            record["parsed_products"] = parsed_products
+            # Copy the cached entries so records never share mutable dicts.
+            record["parsed_products"] = [dict(product) for product in parsed_products]
             record["price"] = f"{total_price:.2f}"
         return record
     except Exception as e:
         logger.error(f"Error parsing product field in record {record}: {e}")
         return record
 
+def has_required_fields(record: Dict[str, str]) -> bool:
+    """
+    Checks that a record has a non-blank value for every field in REQUIRED_FIELDS.
+
+    Args:
+        record (Dict[str, str]): A transaction record.
+
+    Returns:
+        bool: True if all required fields are present and non-blank, otherwise False.
+    """
+    try:
+        values = _required_values(record)
+    except KeyError:
+        return False
+    return all(value.strip() for value in values)
+
 def filter_valid_records(data: List[Dict[str, str]]) -> List[Dict[str, str]]:
     """
     Filters out records missing essential fields.
@@ -122,16 +191,20 @@ def filter_valid_records(data: List[Dict[str, str]]) -> List[Dict[str, str]]:
     Returns:
         List[Dict[str, str]]: Only records with non-empty values for all required fields.
     """
-    required = config["required_fields"]
+    # The level check is hoisted so skipped records are not formatted when warnings are off.
+    warn_enabled = logger.isEnabledFor(logging.WARNING)
     valid = []
     for record in data:
-        if all(record.get(field, "").strip() for field in required):
+        if has_required_fields(record):
             valid.append(record)
-        else:
-            logger.warning(f"Skipping record due to missing fields: {record}")
+        elif warn_enabled:
+            logger.warning("Skipping record due to missing fields: %s", record)
     return valid
 
-def normalise_branches(data: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+# Marker for a key not yet seen in a lookup dict whose values may be None.
+_UNSEEN: Any = object()
+
+def normalise_branches(data: List[Dict[str, str]], inplace: bool = False) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
     """
     Normalises branch data by extracting unique branch names and assigning each a GUID.
     
@@ -139,6 +212,8 @@ def normalise_branches(data: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]]
     
     Args:
         data (List[Dict[str, str]]): Transaction records containing the key "branch".
+        inplace (bool, optional): Update the input records themselves instead of copying each one.
+            Only for callers that no longer need the original records. Defaults to False.
         
     Returns:
         Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
@@ -148,24 +223,32 @@ def normalise_branches(data: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]]
     branches: List[Dict[str, str]] = []
     updated_transactions: List[Dict[str, str]] = []
     branch_ids: Dict[str, str] = {}
+    # Branch id (or None for a blank branch) per raw branch value, like a factorisation of the
+    # column: each distinct raw value is stripped and resolved once, repeats are a single lookup.
+    id_by_raw_branch: Dict[str, Optional[str]] = {}
+    warn_enabled = logger.isEnabledFor(logging.WARNING)
 
     for record in data:
-        branch = record.get("branch", "").strip()
-        if not branch:
-            logger.warning(f"Record missing branch info: {record}")
+        raw_branch = record.get("branch", "")
+        branch_id = id_by_raw_branch.get(raw_branch, _UNSEEN)
+        if branch_id is _UNSEEN:
+            branch = raw_branch.strip()
+            if branch and branch not in branch_ids:
+                branch_ids[branch] = uuid4().hex
+                branches.append({"id": branch_ids[branch], "name": branch})
+            branch_id = id_by_raw_branch[raw_branch] = branch_ids[branch] if branch else None
+        if branch_id is None:
+            if warn_enabled:
+                logger.warning("Record missing branch info: %s", record)
             continue
-        if branch not in branch_ids:
-            branch_id: str = str(uuid4())
-            branch_ids[branch] = branch_id
-            branches.append({"id": branch_id, "name": branch})
-        new_record = record.copy()
+        new_record = record if inplace else record.copy()
         new_record.pop("branch", None)
-        new_record["branch_id"] = branch_ids[branch]
+        new_record["branch_id"] = branch_id
         updated_transactions.append(new_record)
     logger.info(f"Normalised branches: {len(branch_ids)} unique branches found.")
     return branches, updated_transactions
 
-def normalise_products(transactions: List[Dict[str, Any]]) -> Tuple[List[Dict[str, str]], List[Dict[str, Any]], List[Dict[str, str]]]:
+def normalise_products(transactions: List[Dict[str, Any]], inplace: bool = False) -> Tuple[List[Dict[str, str]], List[Dict[str, Any]], List[Dict[str, str]]]:
     """
     Normalises product data by extracting unique product records and creating a transaction_product mapping.
     
@@ -173,10 +256,12 @@ def normalise_products(transactions: List[Dict[str, Any]]) -> Tuple[List[Dict[st
       - Constructs a products_table with unique records, each with keys: "id", "product_name", "size", "flavour", "price".
       - Creates a transaction_product mapping linking each transaction (by its "id") to its product record(s) via a unique product_id.
       - Updates the transaction by removing the "product" and "parsed_products" fields and adding a "product_id" key 
-        (a comma-separated string of the product IDs).
+        (a list of the product IDs; write_csv joins it with ", " when writing).
     
     Args:
         transactions (List[Dict[str, Any]]): Transaction records containing the "parsed_products" field.
+        inplace (bool, optional): Update the input records themselves instead of copying each one.
+            Only for callers that no longer need the original records. Defaults to False.
         
     Returns:
         Tuple[List[Dict[str, str]], List[Dict[str, Any]], List[Dict[str, str]]]:
@@ -189,7 +274,11 @@ def normalise_products(transactions: List[Dict[str, Any]]) -> Tuple[List[Dict[st
     transaction_product_table: List[Dict[str, str]] = []
     product_ids: Dict[tuple, str] = {}
     price_tracker: Dict[Tuple[str, str, str], Dict[str, float]] = {}
-
+    # products_table record per key, so a repeat updates its average price without a table scan.
+    product_by_key: Dict[Tuple[str, str, str], Dict[str, str]] = {}
+    # Lower-cased key per distinct (product_name, size, flavour); the few distinct products
+    # are lower-cased once and every repeat reuses the same key tuple and strings.
+    lowered_keys: Dict[Tuple[str, str, str], Tuple[str, str, str]] = {}
 
     for record in transactions:
         parsed_products = record.get("parsed_products")
@@ -199,44 +288,40 @@ def normalise_products(transactions: List[Dict[str, Any]]) -> Tuple[List[Dict[st
 
         current_product_ids = []
         for entry in parsed_products:
-            key = (
-                entry.get("product_name", "").lower(),
-                entry.get("size", "").lower(),
-                entry.get("flavour", "").lower()
-            )
+            raw_key = (entry.get("product_name", ""), entry.get("size", ""), entry.get("flavour", ""))
+            key = lowered_keys.get(raw_key)
+            if key is None:
+                key = lowered_keys[raw_key] = (raw_key[0].lower(), raw_key[1].lower(), raw_key[2].lower())
             price = float(entry.get("price", 0))
 
             if key not in product_ids:
-                product_id = str(uuid4())
+                product_id = uuid4().hex
                 product_ids[key] = product_id
                 price_tracker[key] = {"total": price, "count": 1}
-                products_table.append({
+                product_by_key[key] = {
                     "id": product_id,
                     "product_name": entry.get("product_name", ""),
                     "size": entry.get("size", ""),
                     "flavour": entry.get("flavour", ""),
                     "price": f"{price:.2f}"
-                })
+                }
+                products_table.append(product_by_key[key])
             else:
                 price_tracker[key]["total"] += price
                 price_tracker[key]["count"] += 1
                 avg_price = price_tracker[key]["total"] / price_tracker[key]["count"]
-
-                for product in products_table:
-                    if product["id"] == product_ids[key]:
-                        product["price"] = f"{avg_price:.2f}"
-                        break
+                product_by_key[key]["price"] = f"{avg_price:.2f}"
 
             current_product_ids.append(product_ids[key])
             transaction_product_table.append({
-                "id": str(uuid4()),
+                "id": uuid4().hex,
                 "transaction_id": record.get("id", ""),
                 "product_id": product_ids[key]
             })
-        new_record = record.copy()
+        new_record = record if inplace else record.copy()
         new_record.pop("product", None)
         new_record.pop("parsed_products", None)
-        new_record["product_id"] = ", ".join(current_product_ids)
+        new_record["product_id"] = current_product_ids
         updated_transactions.append(new_record)
 
     logger.info(f"Normalised products: found {len(products_table)} unique product records.")
@@ -267,17 +352,17 @@ def transform_data(data: List[Dict[str, str]]) -> Dict[str, Any]:
     try:
         logger.info("Starting transaction processing...")
 
-        # step 1. Remove sensitive information.
-        cleaned_records = remove_pii(data)
-        logger.info(f"Sensitive information removed from {len(data)} records.")
+        # step 1. Remove sensitive information. Records are cleaned lazily as steps 2 and 3 consume
+        # them, so no list of cleaned records is held alongside the input.
+        cleaned_records = iter_remove_pii(data)
         
-        # step 2. Filter out records missing required fields.
-        valid_records = [r for r in cleaned_records if all(r.get(k, "").strip() for k in [
-    "product", "qty", "price", "branch", "payment_type", "date_time"
-])]
-        logger.info(f"{len(valid_records)} records remain after filtering for required fields.")
+        # steps 2 and 3. Filter out records missing required fields and parse the 'product' field
+        # of the rest in the same pass, so no intermediate list of valid records is built.
+        parsed_records = [parse_product_field(r) for r in cleaned_records if has_required_fields(r)]
+        logger.info(f"Sensitive information removed from {len(data)} records.")
+        logger.info(f"{len(parsed_records)} records remain after filtering for required fields.")
 
-        if not valid_records:
+        if not parsed_records:
             logger.warning("No valid records found after filtering. Exiting transformation early.")
             return {
                 "final_transactions": [],
@@ -292,18 +377,17 @@ def transform_data(data: List[Dict[str, str]]) -> Dict[str, Any]:
         }
     }
         
-        # step 3. Parse the 'product' field.
-        parsed_records = [parse_product_field(record) for record in valid_records]
-        if parsed_records:
-            logger.debug(f"First parsed record: {parsed_records[0]}")
+        logger.debug("First parsed record: %s", parsed_records[0])
         logger.info("Product field parsing complete.")
         
         # Remove duplicate records.
         first_normalised_form = deduplicate_data(parsed_records)
         logger.info(f"Duplication eradictor process complete: {len(first_normalised_form)} unique records remain.")
         
-        # Normalise branch data.
-        branches_table, transactions_with_branch_id = normalise_branches(first_normalised_form)
+        # Normalise branch data. The deduplicated records are private to this call, so they are
+        # updated in place. Product normalisation still copies: transactions_with_branch_id is
+        # part of the result and must keep its "product" fields.
+        branches_table, transactions_with_branch_id = normalise_branches(first_normalised_form, inplace=True)
         # second_normalised_form = (branches_table, transactions_with_branch_id)
         
         # Normalise product data and produce a transaction_product mapping table.
@@ -346,6 +430,10 @@ def transform_data(data: List[Dict[str, str]]) -> Dict[str, Any]:
 def write_csv(data: List[Dict[str, Any]], filename: str) -> None:
     """
     Writes a list of dictionaries to a CSV file.
+
+    The header is taken from the first record. Rows are written with csv.writer, fetching
+    each record's values with a single itemgetter call rather than one lookup per field.
+    List values (such as a transaction's product_id list) are written joined with ", ".
     
     Args:
         data (List[Dict[str, Any]]): The data to be written.
@@ -355,10 +443,38 @@ def write_csv(data: List[Dict[str, Any]], filename: str) -> None:
         logger.warning(f"No data available to write to {filename}.")
         return
     fieldnames = list(data[0].keys())
-    with open(filename, "w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, quoting=csv.QUOTE_MINIMAL)
-        writer.writeheader()
-        writer.writerows(data)
+    field_keys = data[0].keys()
+    # One C-level call per row for records with exactly the header's fields.
+    get_row = itemgetter(*fieldnames) if len(fieldnames) > 1 else (lambda record: (record[fieldnames[0]],))
+
+    # Columns holding lists are joined only here, at serialisation time.
+    list_columns = [i for i, value in enumerate(data[0].values()) if isinstance(value, list)]
+
+    def serialise(values: Tuple[Any, ...]) -> Tuple[Any, ...]:
+        if not list_columns:
+            return values
+        values = list(values)
+        for i in list_columns:
+            if isinstance(values[i], list):
+                values[i] = ", ".join(values[i])
+        return tuple(values)
+
+    def rows() -> Iterator[Tuple[Any, ...]]:
+        for record in data:
+            if record.keys() == field_keys:
+                yield serialise(get_row(record))
+                continue
+            # Other records are written as csv.DictWriter would: missing fields are left
+            # empty and unexpected fields are an error.
+            extra = record.keys() - field_keys
+            if extra:
+                raise ValueError(f"dict contains fields not in fieldnames: {', '.join(map(repr, extra))}")
+            yield serialise(tuple(record.get(field, "") for field in fieldnames))
+
+    with open(filename, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as csvfile:
+        writer = csv.writer(csvfile, quoting=csv.QUOTE_MINIMAL)
+        writer.writerow(fieldnames)
+        writer.writerows(rows())
     logger.info(f"CSV file written: {filename}")
 
 def write_normalised_csv_files(
@@ -375,6 +491,7 @@ def write_normalised_csv_files(
       - Transaction_product mapping (from third_normalised)
     
     Filenames are generated dynamically using the branch name from the first branch record.
+    The four files are written concurrently in a thread pool.
     
     Args:
         final_transactions (List[Dict[str, Any]]): Final transaction records.
@@ -398,9 +515,15 @@ def write_normalised_csv_files(
     if not os.path.exists(output_dir):
         os.makedirs(output_dir, exist_ok=True)
 
-    write_csv(final_transactions, os.path.join("output", filenames["transaction"]))
-    write_csv(branches_table, os.path.join("output", filenames["branch"]))
     products_table, _, transaction_product_table = third_normalised
-    write_csv(products_table, os.path.join("output", filenames["product"]))
-    write_csv(transaction_product_table, os.path.join("output", filenames["transaction_product"]))
+    outputs = [
+        (final_transactions, os.path.join("output", filenames["transaction"])),
+        (branches_table, os.path.join("output", filenames["branch"])),
+        (products_table, os.path.join("output", filenames["product"])),
+        (transaction_product_table, os.path.join("output", filenames["transaction_product"])),
+    ]
+    # The four files are independent, so their writes overlap; result() re-raises any write error.
+    with ThreadPoolExecutor(max_workers=len(outputs)) as executor:
+        for future in [executor.submit(write_csv, rows, path) for rows, path in outputs]:
+            future.result()
     logger.info("All normalised CSV files have been written.")
\ No newline at end of file
@@ -1,7 +1,26 @@
+import importlib
+import os
 import pytest
-from unittest.mock import patch
-from typing import List
-from src.app import run_etl_pipeline
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+from typing import Generator, List
+import src.app
+from src.app import run_etl_pipeline, get_db_connection, close_db_connection, _extract_executor, main
+
+
+@pytest.fixture(autouse=True)
+def mock_db_connection() -> Generator[MagicMock, None, None]:
+    """
+    Replaces the database connection factory so no test opens a real MySQL connection,
+    and resets the shared connection between tests.
+
+    Yields:
+        MagicMock: The mocked create_db_connection function.
+    """
+    src.app._connection = None
+    with patch("src.app.create_db_connection") as mock_create:
+        yield mock_create
+    src.app._connection = None
 
 
 @pytest.fixture
@@ -66,6 +85,32 @@ def test_pipeline_successful(
     mock_load_data.assert_called_once()
 
 
+@patch("src.app.extract_data")
+@patch("src.app.transform_data")
+@patch("src.app.load_data")
+def test_progress_is_only_printed_when_requested_by_the_gui(
+    mock_load_data, mock_transform_data, mock_extract_data, valid_file_paths: List[str],
+    capsys: pytest.CaptureFixture, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test that progress lines are printed for each stage only when the GUI launcher has set
+    ETL_PROGRESS_MARKER, so library and CLI callers get nothing extra on stdout.
+
+    Asserts:
+        Nothing is printed without the variable; one "<marker> <percent>" line per stage with it.
+    """
+    mock_extract_data.return_value = [{"customer_name": "John", "product": "Coffee", "price": "2.50"}]
+    mock_transform_data.return_value = {"final_transactions": [{"id": 1, "price": "2.50"}]}
+
+    monkeypatch.delenv("ETL_PROGRESS_MARKER", raising=False)
+    run_etl_pipeline(valid_file_paths)
+    assert capsys.readouterr().out == ""
+
+    monkeypatch.setenv("ETL_PROGRESS_MARKER", "PROGRESS")
+    run_etl_pipeline(valid_file_paths)
+    assert capsys.readouterr().out.splitlines() == ["PROGRESS 10", "PROGRESS 40", "PROGRESS 70", "PROGRESS 100"]
+
+
 @patch("src.app.extract_data")
 @patch("src.app.transform_data")
 @patch("src.app.load_data")
@@ -166,3 +211,152 @@ def test_pipeline_loading_failure(
     mock_extract_data.assert_called()
     mock_transform_data.assert_called_once()
     mock_load_data.assert_called_once()
+
+
+@patch("src.app.extract_data")
+@patch("src.app.transform_data")
+@patch("src.app.load_data")
+def test_pipeline_continues_when_first_file_is_empty(
+    mock_load_data, mock_transform_data, mock_extract_data, valid_file_paths: List[str]
+) -> None:
+    """
+    Test that an empty first file does not stop the pipeline when a later file has data.
+
+    Asserts:
+        True is returned and the records from the second file are transformed.
+    """
+    second_file_records = [{"customer_name": "Jane", "product": "Tea", "price": "1.75"}]
+    mock_extract_data.side_effect = [[], second_file_records]
+    mock_transform_data.return_value = {
+        "final_transactions": [{"id": 1, "price": "1.75"}],
+        "branch_data": {"branches_table": [], "transactions_with_branch_id": []},
+        "product_data": {
+            "products_table": [],
+            "transactions_with_product_id": [],
+            "transaction_product_table": [],
+        },
+    }
+
+    result: bool = run_etl_pipeline(valid_file_paths)
+
+    assert result is True
+    assert mock_extract_data.call_count == 2
+    mock_transform_data.assert_called_once_with(second_file_records)
+
+
+def test_db_connection_is_reused_across_calls(mock_db_connection: MagicMock) -> None:
+    """
+    Test that the shared connection is created once and pinged (with reconnect) on reuse.
+
+    Asserts:
+        The factory is called once and later calls return the same, pinged connection.
+    """
+    first = get_db_connection()
+    second = get_db_connection()
+
+    assert first is second
+    mock_db_connection.assert_called_once()
+    first.ping.assert_called_once_with(reconnect=True)
+
+    close_db_connection()
+    first.close.assert_called_once()
+    assert src.app._connection is None
+
+
+@patch("src.app.extract_data")
+@patch("src.app.transform_data")
+@patch("src.app.load_data")
+def test_pipeline_passes_shared_connection_to_load(
+    mock_load_data, mock_transform_data, mock_extract_data, mock_db_connection: MagicMock,
+    valid_file_paths: List[str]
+) -> None:
+    """
+    Test that consecutive pipeline runs load through the same database connection.
+
+    Asserts:
+        load_data receives the shared connection and only one connection is opened.
+    """
+    mock_extract_data.return_value = [{"customer_name": "John", "product": "Coffee", "price": "2.50"}]
+    mock_transform_data.return_value = {
+        "final_transactions": [{"id": 1, "price": "2.50"}],
+        "branch_data": {"branches_table": [], "transactions_with_branch_id": []},
+        "product_data": {
+            "products_table": [],
+            "transactions_with_product_id": [],
+            "transaction_product_table": [],
+        },
+    }
+
+    assert run_etl_pipeline(valid_file_paths) is True
+    assert run_etl_pipeline(valid_file_paths) is True
+
+    mock_db_connection.assert_called_once()
+    connections = {call.args[1] for call in mock_load_data.call_args_list}
+    assert connections == {mock_db_connection.return_value}
+
+
+@patch("src.app.os.path.getsize", return_value=64 * 1024 * 1024)
+@patch("src.app.os.path.isfile", return_value=True)
+def test_large_inputs_are_extracted_in_worker_processes(mock_isfile, mock_getsize, valid_file_paths: List[str]) -> None:
+    """
+    Test that several large files are extracted in a process pool and small inputs in a thread pool.
+
+    Asserts:
+        A ProcessPoolExecutor is chosen for large inputs and a ThreadPoolExecutor otherwise.
+    """
+    with _extract_executor(valid_file_paths) as executor:
+        assert isinstance(executor, ProcessPoolExecutor)
+
+    mock_getsize.return_value = 1024
+    with _extract_executor(valid_file_paths) as executor:
+        assert isinstance(executor, ThreadPoolExecutor)
+
+
+@patch("src.app.run_etl_pipeline")
+def test_main_returns_exit_status(mock_run_pipeline: MagicMock, valid_file_paths: List[str]) -> None:
+    """
+    Test that main() maps the pipeline outcome onto a process exit status.
+
+    Asserts:
+        0 for success, a graceful exit or no files, and 1 when the pipeline raises.
+    """
+    mock_run_pipeline.return_value = True
+    assert main(valid_file_paths) == 0
+
+    mock_run_pipeline.return_value = False
+    assert main(valid_file_paths) == 0
+
+    assert main([]) == 0
+
+    mock_run_pipeline.side_effect = Exception("Database unavailable")
+    assert main(valid_file_paths) == 1
+
+
+def test_env_flag_is_only_set_when_dotenv_file_is_read(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that importing app.py reads db/.env relative to the repository, not the working
+    directory, and only marks the environment as loaded when the file was actually read.
+
+    Asserts:
+        ETL_ENV_LOADED stays unset when no file is found, so the db module's own lookup still runs.
+    """
+    # setenv records the variable's original state (even if unset), so the value set by the
+    # reload below is undone after the test instead of leaking into later tests.
+    monkeypatch.setenv("ETL_ENV_LOADED", "")
+    monkeypatch.delenv("ETL_ENV_LOADED")
+    env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(src.app.__file__))), "db", ".env")
+
+    try:
+        with patch("dotenv.load_dotenv", return_value=False) as mock_load_dotenv:
+            importlib.reload(src.app)
+        mock_load_dotenv.assert_called_once_with(env_path)
+        assert "ETL_ENV_LOADED" not in os.environ
+
+        with patch("dotenv.load_dotenv", return_value=True):
+            importlib.reload(src.app)
+        assert os.environ["ETL_ENV_LOADED"] == "1"
+    finally:
+        # Leave src.app as a plain import would, without the flag set by this test.
+        os.environ.pop("ETL_ENV_LOADED", None)
+        with patch("dotenv.load_dotenv", return_value=False):
+            importlib.reload(src.app)
@@ -0,0 +1,30 @@
+import json
+import pytest
+from utils.config_loader import load_config
+
+def test_load_config_reads_file_on_each_call(tmp_path) -> None:
+    """
+    Tests that load_config returns the file's current contents as a new dict on every call,
+    so no caller shares or sees another caller's changes.
+
+    Returns:
+        None
+    """
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({"default_qty": "1"}))
+
+    first = load_config(str(config_path))
+    first["default_qty"] = "3"
+    config_path.write_text(json.dumps({"default_qty": "2"}))
+
+    assert load_config(str(config_path)) == {"default_qty": "2"}
+
+def test_load_config_missing_file(tmp_path) -> None:
+    """
+    Tests that load_config raises FileNotFoundError for a missing file.
+
+    Returns:
+        None
+    """
+    with pytest.raises(FileNotFoundError):
+        load_config(str(tmp_path / "missing.json"))
@@ -1,9 +1,24 @@
+import os
 import pytest
+import pymysql
 import uuid
 import logging
 from unittest.mock import patch, MagicMock
 from typing import Dict, Any
-from db.db_cafe_alt_solution import load_data
+from pymysql.cursors import RE_INSERT_VALUES
+from itertools import count
+from db.db_cafe_alt_solution import (
+    _chunks,
+    load_data,
+    BRANCH_INSERT_QUERY,
+    PRODUCT_INSERT_QUERY,
+    TRANSACTION_INSERT_QUERY,
+    TRANSACTION_PRODUCT_INSERT_QUERY,
+    TRANSACTION_LOAD_QUERY,
+    BULK_LOAD_SESSION_SQL,
+    FAST_LOAD_SESSION_SQL,
+    RESTORE_FAST_LOAD_SESSION_SQL,
+)
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s %(levelname)s %(message)s')
 logger = logging.getLogger(__name__)
@@ -43,7 +58,173 @@ def test_load_data(mock_connect: MagicMock, sample_transformed_data: Dict[str, A
     load_data(sample_transformed_data, mock_connection)
 
     mock_connection.cursor.assert_called_once()
-    assert mock_cursor.executemany.call_count == 4, "Expected inserts into four tables"
+    assert mock_cursor.executemany.call_count == 4, "Expected 4 executemany calls for 4 tables"
+    statements = [c.args[0] for c in mock_cursor.execute.call_args_list]
+    assert TRANSACTION_LOAD_QUERY not in statements, "LOAD DATA must only be used with file_load=True"
     mock_connection.commit.assert_called_once()
 
-    logger.info("load_data function tested successfully.")
\ No newline at end of file
+    logger.info("load_data function tested successfully.")
+
+
+@pytest.mark.parametrize("query", [
+    BRANCH_INSERT_QUERY,
+    TRANSACTION_INSERT_QUERY,
+    PRODUCT_INSERT_QUERY,
+    TRANSACTION_PRODUCT_INSERT_QUERY,
+])
+def test_insert_queries_are_batched_by_executemany(query: str) -> None:
+    """
+    Tests that each INSERT matches pymysql's multi-row rewrite pattern, so executemany
+    sends one multi-row INSERT per table instead of one statement per row.
+    """
+    assert RE_INSERT_VALUES.match(query), f"Query would not be batched by executemany: {query}"
+
+
+@patch("db.db_cafe_alt_solution.pymysql.connect")
+def test_load_data_rolls_back_and_restores_session_on_failure(
+    mock_connect: MagicMock, sample_transformed_data: Dict[str, Any]
+) -> None:
+    """
+    Tests that a failed insert rolls the whole load back without committing, and that the
+    session settings relaxed by fast_load are restored afterwards.
+    """
+    mock_connection = mock_connect.return_value
+    mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+    mock_cursor.executemany.side_effect = Exception("Insert failed!")
+
+    with pytest.raises(Exception, match="Insert failed!"):
+        load_data(sample_transformed_data, mock_connection, fast_load=True)
+
+    mock_connection.rollback.assert_called_once()
+    mock_connection.commit.assert_not_called()
+    assert mock_cursor.execute.call_args_list[-1].args[0] == RESTORE_FAST_LOAD_SESSION_SQL
+
+
+@patch("db.db_cafe_alt_solution.pymysql.connect")
+def test_load_data_failed_restore_keeps_original_error(
+    mock_connect: MagicMock, sample_transformed_data: Dict[str, Any]
+) -> None:
+    """
+    Tests that when restoring the session fails too (e.g. the connection dropped), load_data
+    still raises the error that stopped the load rather than the restore error.
+    """
+    mock_connection = mock_connect.return_value
+    mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+    mock_cursor.executemany.side_effect = pymysql.err.OperationalError(2013, "Lost connection")
+
+    def fail_restore(query: str, args=None) -> None:
+        if query == RESTORE_FAST_LOAD_SESSION_SQL:
+            raise pymysql.err.InterfaceError(0, "Connection closed")
+
+    mock_cursor.execute.side_effect = fail_restore
+
+    with pytest.raises(pymysql.err.OperationalError, match="Lost connection"):
+        load_data(sample_transformed_data, mock_connection, fast_load=True)
+
+
+@patch("db.db_cafe_alt_solution.pymysql.connect")
+def test_load_data_fast_load_disables_binary_log(
+    mock_connect: MagicMock, sample_transformed_data: Dict[str, Any]
+) -> None:
+    """
+    Tests that binary logging and key checks stay on by default, and that fast_load turns them
+    off before inserting and back on once the load is done.
+    """
+    mock_connection = mock_connect.return_value
+    mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+
+    load_data(sample_transformed_data, mock_connection)
+    statements = [c.args[0] for c in mock_cursor.execute.call_args_list]
+    assert statements == [BULK_LOAD_SESSION_SQL], "Binary log and key checks must stay on by default"
+
+    mock_cursor.reset_mock()
+    load_data(sample_transformed_data, mock_connection, fast_load=True)
+    statements = [c.args[0] for c in mock_cursor.execute.call_args_list]
+    assert statements.index(FAST_LOAD_SESSION_SQL) == 1, "Binary log must be disabled before inserting"
+    assert statements[-1] == RESTORE_FAST_LOAD_SESSION_SQL
+
+
+@patch("db.db_cafe_alt_solution.pymysql.connect")
+def test_load_data_splits_inserts_into_batches(
+    mock_connect: MagicMock, sample_transformed_data: Dict[str, Any]
+) -> None:
+    """
+    Tests that each table's rows are sent in executemany batches of at most batch_size rows,
+    all within a single commit.
+    """
+    mock_connection = mock_connect.return_value
+    mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+    sample_transformed_data["branch_data"]["branches_table"] = [
+        {"id": str(uuid.uuid4()), "name": f"Branch {i}"} for i in range(5)
+    ]
+
+    load_data(sample_transformed_data, mock_connection, batch_size=2)
+
+    branch_calls = [c for c in mock_cursor.executemany.call_args_list if c.args[0] == BRANCH_INSERT_QUERY]
+    assert [len(c.args[1]) for c in branch_calls] == [2, 2, 1], "Expected branches split into batches of 2"
+    mock_connection.commit.assert_called_once()
+
+
+@patch("db.db_cafe_alt_solution.pymysql.connect")
+def test_load_data_file_load_writes_escaped_tab_separated_file(
+    mock_connect: MagicMock, sample_transformed_data: Dict[str, Any]
+) -> None:
+    """
+    Tests that file_load writes transactions to a tab-separated file with None written as \\N
+    and tabs and backslashes escaped, and removes the file once it has been loaded.
+    """
+    mock_connection = mock_connect.return_value
+    mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+    mock_cursor.fetchall.return_value = ()
+    loaded: Dict[str, str] = {}
+
+    def capture_load_file(query: str, args=None) -> None:
+        if query == TRANSACTION_LOAD_QUERY:
+            loaded["path"] = args[0]
+            with open(args[0], encoding="utf-8") as load_file:
+                loaded["contents"] = load_file.read()
+
+    mock_cursor.execute.side_effect = capture_load_file
+    transaction = sample_transformed_data["final_transactions"][0]
+    transaction["payment_type"] = None
+    sample_transformed_data["final_transactions"].append(dict(transaction, payment_type="Ca\tsh\\"))
+
+    load_data(sample_transformed_data, mock_connection, file_load=True)
+
+    assert loaded["contents"] == (
+        f"{transaction['branch_id']}\t2024-11-27 10:00:00\t3.5\t2\t\\N\n"
+        f"{transaction['branch_id']}\t2024-11-27 10:00:00\t3.5\t2\tCa\\tsh\\\\\n"
+    )
+    assert not os.path.exists(loaded["path"]), "Temporary load file should be removed"
+    mock_connection.commit.assert_called_once()
+
+
+@patch("db.db_cafe_alt_solution.pymysql.connect")
+def test_load_data_file_load_fails_on_server_warnings(
+    mock_connect: MagicMock, sample_transformed_data: Dict[str, Any]
+) -> None:
+    """
+    Tests that a warning reported for the LOAD DATA statement (e.g. a value the server had to
+    convert) fails the load and rolls it back instead of storing the converted row.
+    """
+    mock_connection = mock_connect.return_value
+    mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+    mock_cursor.fetchall.return_value = (("Warning", 1366, "Incorrect integer value"),)
+
+    with pytest.raises(pymysql.err.DataError, match="Incorrect integer value"):
+        load_data(sample_transformed_data, mock_connection, file_load=True)
+
+    mock_connection.rollback.assert_called_once()
+    mock_connection.commit.assert_not_called()
+
+
+def test_chunks_consumes_rows_lazily() -> None:
+    """
+    Tests that _chunks pulls only one batch at a time from its input, so load_data never
+    holds more than batch_size parameter tuples in memory. An endless iterator would hang
+    if the rows were materialized first.
+    """
+    batches = _chunks(((n,) for n in count()), 3)
+
+    assert next(batches) == [(0,), (1,), (2,)]
+    assert next(batches) == [(3,), (4,), (5,)]
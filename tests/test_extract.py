@@ -1,7 +1,9 @@
+import os
+import threading
 import pytest
 from io import StringIO
 from typing import List, Dict
-from src.extract.extract import extract_data
+from src.extract.extract import extract_data, iter_extract, iter_records, ENCODING_SAMPLE_SIZE
 
 @pytest.fixture
 def mock_config(mocker) -> dict:
@@ -108,6 +110,31 @@ def test_file_with_header_row(mock_config: dict) -> None:
         f"Expected 'John Doe', got {result[0]['customer_name']}."
     )
 
+def test_header_row_after_leading_blank_line(mock_config: dict, mocker) -> None:
+    """
+    Tests that a header row preceded by blank lines is still recognised and skipped,
+    and that warnings number data rows only (blank lines and the header are not counted).
+
+    Returns:
+        None
+    """
+    mock_warning = mocker.patch("src.extract.extract.logger.warning")
+    csv_data = StringIO(
+        "\n"
+        "Date/Time,Branch,Customer Name,Product,Price,Payment Type,Card Number\n"
+        "2023-04-05 12:00:00,Branch A,John Doe,Laptop,12.00,Card,1234-5678-9123-4567\n"
+        "\n"
+        "2023-04-05 12:05:00,Branch A,Jane Doe,Laptop,abc,Card,1234-5678-9123-4567\n"
+    )
+
+    result: List[Dict[str, str]] = extract_data(csv_data)
+
+    assert len(result) == 1, f"Expected 1 record, got {len(result)}."
+    assert result[0]["customer_name"] == "John Doe", (
+        f"Expected 'John Doe', got {result[0]['customer_name']}."
+    )
+    mock_warning.assert_called_once_with("Row %d skipped due to invalid price value: %s", 2, "abc")
+
 def test_insufficient_fields(mock_config: dict) -> None:
     """
     Tests that extract_data skips rows that have missing fields.
@@ -149,4 +176,152 @@ def test_file_with_duplicate_header_row(mock_config: dict) -> None:
     assert len(result) == 1, f"Expected 1 record after skipping duplicate headers, got {len(result)}."
     assert result[0]["customer_name"] == "John Doe", (
         f"Expected 'John Doe', got {result[0]['customer_name']}."
-    )
\ No newline at end of file
+    )
+
+def test_iter_extract_yields_batches(mock_config: dict) -> None:
+    """
+    Tests that iter_extract streams the same records as extract_data in batches of at most chunk_size.
+
+    Returns:
+        None
+    """
+    rows = "".join(
+        f"2023-04-05 12:0{i}:00,Branch A,Customer {i},Latte - 2.50,2.50,Cash,\n" for i in range(5)
+    )
+    csv_text = "Date/Time,Branch,Customer Name,Product,Price,Payment Type,Card Number\n" + rows
+
+    batches: List[List[Dict[str, str]]] = list(iter_extract(StringIO(csv_text), chunk_size=2))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1], "Expected batches of 2, 2 and 1 records."
+    assert [record for batch in batches for record in batch] == extract_data(StringIO(csv_text))
+
+def test_iter_records_yields_one_record_at_a_time(mock_config: dict) -> None:
+    """
+    Tests that iter_records yields records lazily, before the rest of the input is read.
+
+    Returns:
+        None
+    """
+    csv_data = StringIO(
+        "2023-04-05 12:00:00,Branch A,Customer 0,Latte - 2.50,2.50,Cash,\n"
+        "2023-04-05 12:01:00,Branch A,Customer 1,Latte - 2.50,2.50,Cash,\n"
+    )
+
+    records = iter_records(csv_data)
+    first = next(records)
+
+    assert first["customer_name"] == "Customer 0"
+    assert csv_data.tell() < len(csv_data.getvalue()), "Expected the second row to be unread."
+    assert [record["customer_name"] for record in records] == ["Customer 1"]
+
+@pytest.mark.parametrize("encoding, product", [
+    ("utf-8-sig", "Latte - 2.50"),
+    ("cp1252", "Latte £ - 2.50"),
+])
+def test_file_encoding_is_detected(mock_config: dict, tmp_path, encoding: str, product: str) -> None:
+    """
+    Tests that files saved with a UTF-8 BOM or in cp1252 are read correctly, and the
+    header row of a BOM file is still recognised and skipped.
+
+    Returns:
+        None
+    """
+    csv_path = tmp_path / "encoded.csv"
+    csv_path.write_text(
+        "Date/Time,Branch,Customer Name,Product,Price,Payment Type,Card Number\n"
+        f"2023-04-05 12:00:00,Branch A,John Doe,{product},2.50,Cash,\n",
+        encoding=encoding
+    )
+
+    result = extract_data(str(csv_path))
+
+    assert len(result) == 1, f"Expected 1 record, got {len(result)}."
+    assert result[0]["product"] == product
+
+def test_cp1252_bytes_after_the_encoding_sample_are_decoded(mock_config: dict, tmp_path) -> None:
+    """
+    Tests that a legacy cp1252 file which is plain ASCII for longer than the encoding sample
+    still extracts, with the later "£" decoded as cp1252 rather than failing the read.
+
+    Returns:
+        None
+    """
+    ascii_row = "2023-04-05 12:00:00,Branch A,John Doe,Latte - 2.50,2.50,Cash,\n"
+    row_count = ENCODING_SAMPLE_SIZE // len(ascii_row) + 1
+    csv_path = tmp_path / "legacy.csv"
+    csv_path.write_bytes(
+        (ascii_row * row_count).encode("ascii")
+        + "2023-04-05 12:01:00,Branch A,Jane Doe,Latte £ - 2.50,2.50,Cash,\n".encode("cp1252")
+    )
+
+    result = extract_data(str(csv_path))
+
+    assert len(result) == row_count + 1, f"Expected {row_count + 1} records, got {len(result)}."
+    assert result[-1]["product"] == "Latte £ - 2.50"
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="FIFOs are POSIX only")
+def test_fifo_is_extracted(mock_config: dict, tmp_path) -> None:
+    """
+    Tests that a named pipe (e.g. <(cat file.csv)) is extracted in full: its data must not be
+    consumed by encoding detection, and the rejected read-ahead advice is ignored.
+
+    Returns:
+        None
+    """
+    fifo_path = str(tmp_path / "data.fifo")
+    os.mkfifo(fifo_path)
+    result: List[Dict[str, str]] = []
+
+    # Extraction runs in a daemon thread so a reader left blocked on the pipe fails the test
+    # instead of hanging it.
+    reader = threading.Thread(target=lambda: result.extend(extract_data(fifo_path)), daemon=True)
+    reader.start()
+    with open(fifo_path, "w", encoding="utf-8") as fifo:
+        fifo.write(
+            "Date/Time,Branch,Customer Name,Product,Price,Payment Type,Card Number\n"
+            "2023-04-05 12:00:00,Branch A,John Doe,Latte - 2.50,2.50,Cash,\n"
+        )
+    reader.join(timeout=10)
+
+    assert not reader.is_alive(), "Extraction blocked on the FIFO."
+    assert len(result) == 1, f"Expected 1 record, got {len(result)}."
+    assert result[0]["customer_name"] == "John Doe"
+
+def test_read_ahead_advice_is_optional(mock_config: dict, mocker, tmp_path) -> None:
+    """
+    Tests that a file is still extracted when the kernel rejects the sequential read-ahead
+    advice, as it does for pipes (ESPIPE).
+
+    Returns:
+        None
+    """
+    mocker.patch("src.extract.extract.os.posix_fadvise", create=True, side_effect=OSError(29, "Illegal seek"))
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("2023-04-05 12:00:00,Branch A,John Doe,Latte,2.50,Cash,\n", encoding="utf-8")
+
+    result = extract_data(str(csv_path))
+
+    assert len(result) == 1, f"Expected 1 record, got {len(result)}."
+
+@pytest.mark.parametrize("raw_price, expected", [
+    ("2.50", "2.50"),
+    ("12.5", "12.50"),
+    ("02.50", "2.50"),
+    (" 3 ", "3.00"),
+    ("1e1", "10.00"),
+    ("£3.5", "3.50"),
+    ("€2.50", "2.50"),
+])
+def test_price_is_formatted_to_two_decimals(mock_config: dict, raw_price: str, expected: str) -> None:
+    """
+    Tests that prices already in two-decimal form are kept, and any other valid number is
+    normalised to two decimals, with a leading currency symbol dropped.
+
+    Returns:
+        None
+    """
+    csv_data = StringIO(f"2023-04-05 12:00:00,Branch A,John Doe,Latte,{raw_price},Cash,\n")
+
+    result = extract_data(csv_data)
+
+    assert result[0]["price"] == expected
@@ -52,20 +52,21 @@ def app() -> Generator[ETLApp, None, None]:
 
 def create_mock_popen(returncode=0, stdout="Pipeline ran successfully", stderr=""):
     """
-    Simulates a subprocess.Popen object with mock polling and communication.
+    Simulates a subprocess.Popen object whose merged output is streamed line by line.
 
     This is used to mimic asynchronous subprocess behaviour in the GUI's ETL logic.
     Args:
         returncode (int): The return code the process should exit with.
         stdout (str): Mocked standard output.
-        stderr (str): Mocked standard error.
+        stderr (str): Mocked standard error (merged into stdout, as in the GUI).
 
     Returns:
         MagicMock: A mocked subprocess.Popen-like object.
     """
     mock_process = MagicMock()
-    mock_process.poll.side_effect = [None, None, returncode]
-    mock_process.communicate.return_value = (stdout, stderr)
+    mock_process.stdout = iter((stdout + stderr).splitlines(keepends=True))
+    mock_process.wait.return_value = returncode
+    mock_process.poll.return_value = returncode
     mock_process.returncode = returncode
     return mock_process
 
@@ -147,4 +148,76 @@ def test_run_etl_pipeline_called_failure(mock_popen: MagicMock, app: ETLApp, cap
     assert "Status: Error" in out
     # assert "ETL pipeline failed:" in app.log_text.get("1.0", "end")
     # assert "Something went wrong" in app.log_text.get("1.0", "end")
-    # assert "Status: Error" in app.status_label.cget("text")
\ No newline at end of file
+    # assert "Status: Error" in app.status_label.cget("text")
+
+def test_log_messages_are_flushed_in_one_batch() -> None:
+    """
+    Tests that log() only queues messages and _drain_logs() writes them to the widget together.
+
+    Returns:
+        None
+    """
+    root: tk.Tk = tk.Tk()
+    root.withdraw()
+    try:
+        gui = ETLApp(root)
+        gui.log("first message")
+        gui.log("second message")
+        assert gui.log_text.get("1.0", "end-1c") == "", "Messages should wait in the queue until drained."
+
+        gui._drain_logs()
+
+        text = gui.log_text.get("1.0", "end-1c")
+        assert "first message" in text and "second message" in text
+    finally:
+        root.destroy()
+
+@patch("src.gui.subprocess.Popen")
+def test_etl_runs_in_daemon_thread(mock_popen: MagicMock, app: ETLApp) -> None:
+    """
+    Tests that the ETL worker thread is a daemon, so closing the window never hangs on it.
+
+    Returns:
+        None
+    """
+    mock_popen.return_value = create_mock_popen()
+
+    app.start_etl()
+    app.etl_thread.join()
+
+    assert app.etl_thread.daemon, "The ETL worker thread should be a daemon thread."
+
+@patch("src.gui.subprocess.Popen")
+def test_stop_before_launch_terminates_process(mock_popen: MagicMock, app: ETLApp) -> None:
+    """
+    Tests that a stop requested while the subprocess is still being launched terminates it
+    as soon as Popen returns.
+
+    Returns:
+        None
+    """
+    mock_popen.return_value = create_mock_popen()
+    app.stop_event.set()
+
+    app.run_etl_pipeline()
+
+    mock_popen.return_value.terminate.assert_called_once()
+
+def test_progress_follows_pipeline_stages(app: ETLApp) -> None:
+    """
+    Tests that progress is only taken from the pipeline's "PROGRESS <n>" lines and never moves backwards.
+
+    Returns:
+        None
+    """
+    assert app._track_progress("PROGRESS 40\n")
+    assert app._progress_value == 40
+
+    assert app._track_progress("PROGRESS 10\n")
+    assert app._progress_value == 40, "Progress should never move backwards."
+
+    assert not app._track_progress("2024-01-01 12:00:01 - app - INFO - ETL pipeline completed successfully.")
+    assert app._progress_value == 40, "Log wording should not move the progress bar."
+
+    assert app._track_progress("PROGRESS 100\n")
+    assert app._progress_value == 100
@@ -53,3 +53,16 @@ def test_generate_logs_for_modules() -> None:
 
 
 
+def test_get_logger_does_not_propagate_to_root() -> None:
+    """Tests that get_logger configures its handlers once and does not also pass records
+    to the root logger's handlers, which would write every message twice.
+
+    Returns:
+        None
+    """
+    logger: logging.Logger = get_logger("logger", log_level=logging.DEBUG)
+    handler_count: int = len(logger.handlers)
+
+    assert get_logger("logger", log_level=logging.DEBUG) is logger
+    assert len(logger.handlers) == handler_count, "Handlers should only be added once!"
+    assert logger.propagate is False, "Records should not propagate to the root logger!"
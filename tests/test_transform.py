@@ -1,5 +1,6 @@
 import os
 import uuid
+import logging
 import pytest
 from typing import Dict, List, Tuple, Any
 from unittest.mock import patch
@@ -11,8 +12,11 @@ from src.transform.transform import (
     normalise_branches,
     normalise_products,
     transform_data,
-    write_normalised_csv_files
+    write_normalised_csv_files,
+    write_csv
 )
+from src.transform.remove_duplicates import deduplicate_data
+from src.transform.remove_sensitive_data import remove_pii, iter_remove_pii
 
 logger = get_logger("test_transform")
 
@@ -50,6 +54,32 @@ def test_parse_product_field_extracts_product_details() -> None:
 
     logger.info("parse_product_field test passed.")
 
+def test_parse_product_field_does_not_share_entries_between_records() -> None:
+    """
+    Tests that records with the same product field get equal but independent parsed_products.
+    """
+    first: Dict[str, Any] = parse_product_field({"product": "Large Latte - Hazelnut - 2.45"})
+    second: Dict[str, Any] = parse_product_field({"product": "Large Latte - Hazelnut - 2.45"})
+
+    assert first["parsed_products"] == second["parsed_products"]
+    first["parsed_products"][0]["price"] = 0.0
+    assert second["parsed_products"][0]["price"] == 2.45, "Parsed entries should not be shared."
+    logger.info("parse_product_field memoisation test passed.")
+
+def test_parse_product_field_shares_entry_parsing_across_fields() -> None:
+    """
+    Tests that an entry repeated in different product fields parses the same way each time,
+    and that the records still get independent entry dicts.
+    """
+    first: Dict[str, Any] = parse_product_field({"product": "Regular Mocha - 2.30, Large Tea - 1.80"})
+    second: Dict[str, Any] = parse_product_field({"product": "Large Tea - 1.80, Regular Mocha - 2.30"})
+
+    assert first["parsed_products"][1] == second["parsed_products"][0]
+    assert first["price"] == second["price"] == "4.10"
+    first["parsed_products"][1]["price"] = 0.0
+    assert second["parsed_products"][0]["price"] == 1.80, "Parsed entries should not be shared."
+    logger.info("parse_product_field entry memoisation test passed.")
+
 def test_filter_valid_records_excludes_incomplete_rows() -> None:
     """
     Tests that filter_valid_records removes rows with missing required fields.
@@ -102,6 +132,41 @@ def test_normalise_branches_returns_expected_structure() -> None:
     logger.info("normalise_branches test passed.")
 
 
+def test_normalise_branches_maps_equal_names_to_one_branch() -> None:
+    """
+    Tests that branch names differing only in surrounding whitespace share one branch id,
+    and records without a branch are skipped.
+    """
+    transactions: List[Dict[str, str]] = [
+        {"id": "1", "branch": "Leeds"},
+        {"id": "2", "branch": " Leeds "},
+        {"id": "3", "branch": "  "},
+        {"id": "4", "branch": "Leeds"},
+    ]
+
+    branches_table, updated_transactions = normalise_branches(transactions)
+
+    assert branches_table == [{"id": branches_table[0]["id"], "name": "Leeds"}]
+    assert [t["id"] for t in updated_transactions] == ["1", "2", "4"]
+    assert {t["branch_id"] for t in updated_transactions} == {branches_table[0]["id"]}
+    logger.info("normalise_branches factorisation test passed.")
+
+
+def test_normalise_branches_inplace_reuses_input_records() -> None:
+    """
+    Tests that normalise_branches copies records by default and updates them in place when asked.
+    """
+    record: Dict[str, str] = {"id": "1", "branch": "Leeds"}
+
+    _, copied = normalise_branches([record])
+    assert copied[0] is not record and record["branch"] == "Leeds"
+
+    _, updated = normalise_branches([record], inplace=True)
+    assert updated[0] is record
+    assert "branch" not in record and record["branch_id"] == updated[0]["branch_id"]
+    logger.info("normalise_branches inplace test passed.")
+
+
 def test_normalise_products_returns_expected_tables() -> None:
     """
     Tests that normalise_products returns products_table, updated transactions, and transaction_product_table.
@@ -124,6 +189,22 @@ def test_normalise_products_returns_expected_tables() -> None:
     assert len(products_table) == 2, f"Expected 2 unique products, got {len(products_table)}"
     logger.info("normalise_products test passed.")
 
+def test_normalise_products_averages_repeated_product_prices() -> None:
+    """
+    Tests that a product appearing in several transactions is listed once, priced at the average.
+    """
+    transactions: List[Dict[str, Any]] = [
+        {"id": "1", "parsed_products": [{"size": "large", "product_name": "mocha", "flavour": "", "price": 2.50}]},
+        {"id": "2", "parsed_products": [{"size": "regular", "product_name": "tea", "flavour": "", "price": 1.20}]},
+        {"id": "3", "parsed_products": [{"size": "Large", "product_name": "Mocha", "flavour": "", "price": 3.00}]},
+    ]
+
+    products_table, updated_transactions, _ = normalise_products(transactions)
+
+    assert [p["price"] for p in products_table] == ["2.75", "1.20"]
+    assert updated_transactions[0]["product_id"] == updated_transactions[2]["product_id"]
+    logger.info("normalise_products price averaging test passed.")
+
 def test_transform_data_returns_expected_structure() -> None:
     """
     Tests that transform_data returns a dictionary with expected keys and structures.
@@ -164,19 +245,133 @@ def test_transform_data_returns_expected_structure() -> None:
     # Final transactions
     assert isinstance(result["final_transactions"], list)
     assert len(result["final_transactions"]) > 0
+    assert all("customer_name" not in t and "card_number" not in t for t in result["final_transactions"]), \
+        "PII should be removed from final transactions."
     logger.info("transform_data structure test passed.")
 
-    logger.info("Cleaned transactions:")
-    for record in result["final_transactions"]:
-        logger.info(record)
+    # Records are formatted only if INFO is enabled.
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Cleaned transactions:")
+        for record in result["final_transactions"]:
+            logger.info("%s", record)
+
+        logger.info("Normalised products:")
+        for product in result["product_data"]["products_table"]:
+            logger.info("%s", product)
+
+def test_deduplicate_data_compares_nested_values() -> None:
+    """
+    Tests that deduplicate_data treats records with equal nested values as duplicates,
+    regardless of key order, and keeps the first occurrence.
+    """
+    first: Dict[str, Any] = {
+        "product": "Latte - 2.50",
+        "parsed_products": [{"size": "", "product_name": "latte", "flavour": "", "price": 2.5}]
+    }
+    duplicate: Dict[str, Any] = {
+        "parsed_products": [{"price": 2.5, "flavour": "", "product_name": "latte", "size": ""}],
+        "product": "Latte - 2.50"
+    }
+    different: Dict[str, Any] = {
+        "product": "Latte - 2.50",
+        "parsed_products": [{"size": "large", "product_name": "latte", "flavour": "", "price": 2.5}]
+    }
+
+    result: List[Dict[str, Any]] = deduplicate_data([first, duplicate, different])
+
+    assert len(result) == 2, f"Expected 2 unique records, got {len(result)}"
+    assert result[0] is first, "Expected the first occurrence to be kept."
+    logger.info("deduplicate_data test passed.")
+
+def test_deduplicate_data_uses_record_id_when_present() -> None:
+    """
+    Tests that records with the same id are duplicates even if other fields differ,
+    while records without an id are still compared on all fields.
+    """
+    records: List[Dict[str, str]] = [
+        {"id": "a", "price": "2.50"},
+        {"id": "a", "price": "2.75"},
+        {"id": "b", "price": "2.50"},
+        {"price": "2.50"},
+        {"price": "2.50"},
+    ]
+
+    result: List[Dict[str, str]] = deduplicate_data(records)
+
+    assert result == [records[0], records[2], records[3]], f"Unexpected result: {result}"
+    logger.info("deduplicate_data id test passed.")
+
+
+def test_remove_pii_returns_copies_without_sensitive_fields() -> None:
+    """
+    Tests that remove_pii drops the given fields from new records and leaves the input untouched.
+    """
+    record: Dict[str, str] = {"customer_name": "Alice", "card_number": "1234", "branch": "London"}
+
+    result: List[Dict[str, str]] = remove_pii([record], ["customer_name", "card_number"])
+
+    assert result == [{"branch": "London"}], f"Unexpected result: {result}"
+    assert record["customer_name"] == "Alice", "The input record should not be modified."
+    logger.info("remove_pii test passed.")
+
+
+def test_remove_pii_defaults_remove_customer_name_and_card_number() -> None:
+    """
+    Tests that remove_pii and iter_remove_pii, called without sensitive_fields, drop the
+    snake_case customer_name and card_number keys produced by extract.
+    """
+    record: Dict[str, str] = {"customer_name": "Alice", "card_number": "1234", "branch": "London"}
+
+    assert remove_pii([record]) == [{"branch": "London"}]
+    assert list(iter_remove_pii([record])) == [{"branch": "London"}]
+    logger.info("remove_pii defaults test passed.")
+
+
+def test_remove_pii_raises_on_invalid_input() -> None:
+    """
+    Tests that remove_pii raises instead of returning None when the data cannot be processed.
+    """
+    with pytest.raises(AttributeError):
+        remove_pii([None])
+    logger.info("remove_pii error test passed.")
+
+
+def test_write_csv_joins_list_values(tmp_path) -> None:
+    """
+    Tests that write_csv writes list values (such as product_id) as a ", "-joined string.
+    """
+    output = tmp_path / "transactions.csv"
+    records: List[Dict[str, Any]] = [
+        {"branch_id": "b1", "product_id": ["p1", "p2"]},
+        {"branch_id": "b2", "product_id": ["p3"]},
+    ]
+
+    write_csv(records, str(output))
+
+    assert output.read_text(encoding="utf-8").splitlines() == [
+        "branch_id,product_id",
+        'b1,"p1, p2"',
+        "b2,p3",
+    ]
+    logger.info("write_csv list column test passed.")
+
+
+def test_iter_remove_pii_cleans_records_lazily() -> None:
+    """
+    Tests that iter_remove_pii only cleans records as they are consumed.
+    """
+    consumed: List[int] = []
+
+    def records():
+        for i in range(3):
+            consumed.append(i)
+            yield {"customer_name": f"Customer {i}", "branch": "London"}
 
-    logger.info("Normalised products:")
-    for product in result["product_data"]["products_table"]:
-        logger.info(product)
+    cleaned = iter_remove_pii(records(), ["customer_name"])
 
-    logger.info("Normalised products:")
-    for product in result["product_data"]["products_table"]:
-        logger.info(product)
+    assert next(cleaned) == {"branch": "London"}
+    assert consumed == [0], "Only the first record should have been read."
+    logger.info("iter_remove_pii test passed.")
 
 
 @patch("src.transform.transform.write_csv")
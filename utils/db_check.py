@@ -1,4 +1,5 @@
 import os
+import sys
 import pymysql
 import logging
 from typing import List, Tuple, Any
@@ -10,12 +11,17 @@ load_dotenv()
 
 logger = get_logger("db_inspect", log_level=logging.DEBUG)
 
+# Rows fetched from the server, and printed, per batch.
+FETCH_BATCH_SIZE: int = 1000
+
 def inspect_products() -> None:
     """
     Connects to the MySQL database, retrieves all product records from the
     'products' table, and prints selected product details (product name, size, flavour, and price).
 
     This utility is useful for verifying that data has been loaded correctly into the database.
+    Rows are streamed with a server-side cursor in batches of FETCH_BATCH_SIZE, so memory use
+    does not grow with the size of the table, and each batch is printed with a single write.
     
     Returns:
         None
@@ -31,7 +37,7 @@ def inspect_products() -> None:
             password=os.getenv("mysql_pass", ""),
             database=os.getenv("mysql_db", "cafe")
         )
-        cursor = conn.cursor()
+        cursor = conn.cursor(pymysql.cursors.SSCursor)
 
         # Construct a query to select product details.
         # Adjust this query if your schema uses different column names.
@@ -43,13 +49,18 @@ def inspect_products() -> None:
         logger.info("Executing query: " + query)
         cursor.execute(query)
 
-        # Fetch all rows from the query result.
-        rows: List[Tuple[Any, ...]] = cursor.fetchall()
+        # Stream the rows from the server one batch at a time.
         logger.info("Retrieved products:")
-        for row in rows:
+        while True:
+            rows: List[Tuple[Any, ...]] = cursor.fetchmany(FETCH_BATCH_SIZE)
+            if not rows:
+                break
             # Assuming the query returns columns in the order:
             # product_name, size, flavour, price.
-            print(f"Product Name: {row[0]}, Size: {row[1]}, Flavour: {row[2]}, Price: {row[3]}")
+            sys.stdout.write("".join(
+                f"Product Name: {row[0]}, Size: {row[1]}, Flavour: {row[2]}, Price: {row[3]}\n"
+                for row in rows
+            ))
 
         cursor.close()
         conn.close()
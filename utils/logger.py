@@ -32,9 +32,12 @@ def get_logger(module_name: str, log_level: int = logging.DEBUG) -> logging.Logg
 
     # Avoid adding multiple handlers for the same logger
     if not logger.handlers:
+        # Records are written by this logger's own handlers only; propagating them to
+        # handlers configured on the root logger would write every line twice.
+        logger.propagate = False
+
         # Create a file handler for writing logs to a module's log file
         file_handler = logging.FileHandler(log_file, mode="a", encoding="utf-8")
-        print(f"FileHandler created for: {log_file}")
         file_handler.setLevel(log_level)
 
         # Console handler for displaying logs in the terminal
@@ -53,11 +56,4 @@ def get_logger(module_name: str, log_level: int = logging.DEBUG) -> logging.Logg
         logger.addHandler(file_handler)
         logger.addHandler(console_handler)
 
-    # debug log to check if the function is called
-    logger.debug(f"Logger '{module_name}' writing to {log_file}")
-
-    # List all handlers for the logger
-    for handler in logger.handlers:
-        logger.debug(f"Handler for '{module_name}': {handler}")
-
     return logger